@@ -1,67 +1,39 @@
 def extract_arena(file_path, workflow_path):
-    import pdfplumber
-    import pandas as pd
-    import re
+    from char_cache import load_chars
+    from nav_dates import nav_date
+    from nav_history import prev_nav
+    from row_features import classify_rows, densest_row, kerning_safe_comma_numbers
+    from instrumentation import mark
+    from row_grouping import group_char_rows
+    from workflow_cache import load_workflow
 
     # --------------------------------------------------
     # 1. Read characters from first page
     # --------------------------------------------------
-    with pdfplumber.open(file_path) as pdf:
-        page = pdf.pages[0]
-        chars = page.chars
+    chars = load_chars(file_path, first_page_only=True)
 
     if not chars:
         raise ValueError("Arena PDF: no characters extracted")
+    mark("parse", chars=len(chars))
 
     # --------------------------------------------------
     # 2. Group characters by Y position (rows)
     # --------------------------------------------------
-    rows = {}
-    for c in chars:
-        y = round(c["top"], 1)
-        rows.setdefault(y, []).append(c)
+    rows = group_char_rows(chars)
+    mark("grouping", rows=len(rows))
 
     # --------------------------------------------------
-    # 3. Rebuild raw text per row (x-sorted)
+    # 3. Classify every row once (text, numeric density)
     # --------------------------------------------------
-    row_text = {}
-    for y, rchars in rows.items():
-        text = "".join(
-            c["text"] for c in sorted(rchars, key=lambda x: x["x0"])
-        )
-        row_text[y] = text
+    features = classify_rows(rows, nav_numbers=kerning_safe_comma_numbers)
+    mark("classify", rows=len(features))
 
     # --------------------------------------------------
     # 4. Detect NAV / MTD rows by NUMERIC DENSITY
     #    (not by text heuristics)
     # --------------------------------------------------
-    row_metrics = {}
-
-    for y, text in row_text.items():
-        # Capture kerning-split NAV numbers safely
-        raw_nav_tokens = re.findall(r'[\d,\s]{7,}', text)
-        nav_nums = []
-        for tok in raw_nav_tokens:
-            cleaned = tok.replace(" ", "")
-            if re.fullmatch(r'\d{1,3}(?:,\d{3})+', cleaned):
-                nav_nums.append(cleaned)
-
-        # MTD values are safe as-is
-        mtd_nums = re.findall(r'-?\d+\.\d+%', text)
-
-        row_metrics[y] = {
-            "nav_count": len(nav_nums),
-            "mtd_count": len(mtd_nums),
-            "nav_nums": nav_nums,
-            "mtd_nums": mtd_nums
-        }
-
-    # Pick densest numeric rows
-    nav_row_y = max(row_metrics, key=lambda y: row_metrics[y]["nav_count"])
-    mtd_row_y = max(row_metrics, key=lambda y: row_metrics[y]["mtd_count"])
-
-    nav_tokens = row_metrics[nav_row_y]["nav_nums"]
-    mtd_tokens = row_metrics[mtd_row_y]["mtd_nums"]
+    nav_tokens = densest_row(features, "nav_count")["nav_nums"]
+    mtd_tokens = densest_row(features, "mtd_count")["mtd_nums"]
 
     if not nav_tokens or not mtd_tokens:
         raise ValueError("Arena PDF: failed to detect NAV or MTD values")
@@ -71,16 +43,19 @@ def extract_arena(file_path, workflow_path):
     # --------------------------------------------------
     nav_values = [float(x.replace(",", "")) for x in nav_tokens]
     mtd_values = [float(x.replace("%", "")) for x in mtd_tokens]
+    mark("row_detection", nav=len(nav_values), mtd=len(mtd_values))
 
     # --------------------------------------------------
     # 6. Load workflow (SOURCE OF TRUTH)
     # --------------------------------------------------
-    wf = pd.read_excel(workflow_path)
-    wf = wf[['Fund UCN', 'Fund Name', 'DATE', 'NAV (thous)']]
+    wf = load_workflow(
+        workflow_path, columns=['Fund UCN', 'Fund Name', 'DATE', 'NAV (thous)']
+    )
     wf.rename(columns={'NAV (thous)': 'Prev NAV'}, inplace=True)
+    mark("workflow", funds=len(wf))
 
-    wf['NAV Date'] = nav_date(wf['DATE'].tolist())
-    wf['NAV Date'] = wf['NAV Date'].dt.strftime("%m/%d/%Y")
+    nav_dates = nav_date(wf['DATE'])
+    wf['NAV Date'] = nav_dates.dt.strftime("%m/%d/%Y")
 
     # --------------------------------------------------
     # 7. Hard safety checks (prevents silent corruption)
@@ -103,7 +78,11 @@ def extract_arena(file_path, workflow_path):
     wf['NAV'] = nav_values
     wf['MTD'] = mtd_values
 
-    wf['Prev NAV'] = wf['Prev NAV'].astype(float)
+    # Prev NAV from the NAV history (previous month end);
+    # the workbook value only covers funds not stored yet
+    wf['Prev NAV'] = prev_nav(wf['Fund UCN'], nav_dates).fillna(
+        wf['Prev NAV'].astype(float)
+    )
     wf['Variance'] = abs(
         (wf['NAV'] - wf['Prev NAV']) / wf['Prev NAV'] * 100
     )
@@ -111,5 +90,6 @@ def extract_arena(file_path, workflow_path):
     wf = wf[
         ['Fund UCN', 'Fund Name', 'NAV Date', 'NAV', 'MTD', 'Prev NAV', 'Variance']
     ].sort_values(by='Variance')
+    mark("variance", funds=len(wf))
 
     return wf
@@ -0,0 +1,156 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from extractors import (
+    DEFAULT_VARIANT, EXTRACTION_ERRORS, WHOLE_DOCUMENT, call_extractor, load_extractor,
+)
+from nav_history import append_history
+from result_sink import open_sink
+from workflow_cache import snapshot_path
+
+
+def collect_pdfs(source):
+    """Expands a folder, glob pattern or list of paths into sorted PDF paths."""
+    if isinstance(source, (list, tuple)):
+        return [str(p) for p in source]
+
+    source = str(source)
+    if os.path.isdir(source):
+        pattern = os.path.join(source, "*.pdf")
+    else:
+        pattern = source
+
+    return sorted(
+        p for p in glob.glob(pattern)
+        if p.lower().endswith(".pdf")
+    )
+
+
+def _extract_one(task):
+    # Runs inside a worker process: one statement per call
+    file_path, workflow_path, variant, parse_workers = task
+
+    # Spare cores go to parsing this statement's pages in parallel
+    previous = os.environ.get("ARENA_PARSE_WORKERS")
+    if parse_workers > 1:
+        os.environ["ARENA_PARSE_WORKERS"] = str(parse_workers)
+    try:
+        df = call_extractor(load_extractor(variant), file_path, workflow_path)
+    except EXTRACTION_ERRORS as exc:
+        return file_path, None, f"{type(exc).__name__}: {exc}"
+    finally:
+        if previous is None:
+            os.environ.pop("ARENA_PARSE_WORKERS", None)
+        else:
+            os.environ["ARENA_PARSE_WORKERS"] = previous
+    if not isinstance(df, pd.DataFrame):
+        # The gemini scripts return their error message as a string
+        return file_path, None, f"{variant} returned {type(df).__name__}: {df}"
+    return file_path, df, None
+
+
+def extract_batch(source, workflow_path, variant=DEFAULT_VARIANT,
+                  max_workers=None, on_error="raise", sink=None, history=True):
+    """
+    Runs one extractor variant over many Arena PDFs on a process pool.
+
+    With sink (a .csv path, a Parquet folder path, or an open sink) each
+    statement's rows are written as soon as they arrive and nothing is
+    kept in memory; the return value is then one status row per PDF.
+    With history, each statement's NAVs go to the nav_history store
+    (from this process only, so there is one writer).
+    """
+
+    # --------------------------------------------------
+    # 1. Resolve the batch
+    # --------------------------------------------------
+    pdfs = collect_pdfs(source)
+    if not pdfs:
+        raise ValueError(f"Arena batch: no PDFs found for {source!r}")
+
+    if on_error not in ("raise", "skip"):
+        raise ValueError("on_error must be 'raise' or 'skip'")
+
+    # --------------------------------------------------
+    # 2. Fan out the PDF parsing (pdfminer holds the GIL,
+    #    so processes, not threads)
+    # --------------------------------------------------
+    # Build the workflow snapshot once up front so no worker
+    # pays for openpyxl; each worker then keeps it in memory
+    snapshot_path(workflow_path)
+
+    cpus = os.cpu_count() or 1
+    max_workers = max_workers or cpus
+    max_workers = min(max_workers, len(pdfs))
+
+    # Fewer statements than cores: split each one's pages as well, for
+    # variants that parse the whole document (an early exit would not wait)
+    parse_workers = 1
+    if len(pdfs) < cpus and variant in WHOLE_DOCUMENT:
+        parse_workers = max(1, cpus // max_workers)
+    tasks = [(p, workflow_path, variant, parse_workers) for p in pdfs]
+
+    if isinstance(sink, (str, os.PathLike)):
+        sink = open_sink(sink)
+
+    if max_workers == 1:
+        frames, status, failures = _collect(map(_extract_one, tasks), sink, history)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames, status, failures = _collect(
+                pool.map(_extract_one, tasks, chunksize=1), sink, history
+            )
+
+    if failures and on_error == "raise":
+        details = "; ".join(f"{os.path.basename(p)}: {e}" for p, e in failures)
+        raise ValueError(f"Arena batch: {len(failures)} statement(s) failed ({details})")
+
+    if len(failures) == len(pdfs):
+        raise ValueError("Arena batch: every statement failed")
+
+    if sink is not None:
+        summary = pd.DataFrame(status, columns=["Source File", "Rows", "Error"])
+        summary.attrs["failures"] = failures
+        return summary
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined.attrs["failures"] = failures
+    return combined
+
+
+def _collect(results, sink, history=False):
+    # --------------------------------------------------
+    # 3. Combine in input order, tagging the source file;
+    #    with a sink, write each statement and let it go
+    # --------------------------------------------------
+    frames = []
+    status = []
+    failures = []
+    try:
+        for file_path, df, error in results:
+            name = os.path.basename(file_path)
+            if error is not None:
+                failures.append((file_path, error))
+                status.append((name, 0, error))
+                continue
+            if history:
+                append_history(df)
+            df = df.copy()
+            df.insert(0, "Source File", name)
+            status.append((name, len(df), None))
+            if sink is None:
+                frames.append(df)
+            else:
+                sink.write(df)
+    finally:
+        if sink is not None:
+            sink.close()
+    return frames, status, failures
+
+
+# df = extract_batch("statements/2025-09/", "workflow.xlsx")
+# df = extract_batch("statements/*/Arena*.pdf", "workflow.xlsx", variant="abc", max_workers=8)
+# status = extract_batch("statements/2025-09/", "workflow.xlsx", sink="out/arena_2025-09/")
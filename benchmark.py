@@ -0,0 +1,242 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from cascade import result_values
+from extractors import EXTRACTION_ERRORS, VARIANTS, call_extractor, load_extractor
+from page_stream import stream_rows
+from pdf_backend import BACKENDS, iter_page_chars
+from synthetic_pdf import make_statement
+from workflow_cache import clear_memory
+
+FUND_COUNTS = (5, 10, 25, 50, 100, 200)
+
+# NAV / MTD tolerances when scoring against ground truth
+NAV_TOLERANCE = 0.5
+MTD_TOLERANCE = 0.005
+
+
+def score(result, truth):
+    """
+    Share of funds whose NAV and MTD both match the ground truth. Rows are
+    matched by Fund UCN when the variant keeps it, otherwise by position.
+    """
+    if not isinstance(result, pd.DataFrame) or result.empty:
+        return 0.0
+
+    expected = pd.DataFrame(truth["funds"])
+    if "Fund UCN" in result.columns:
+        got = result.set_index("Fund UCN").reindex(expected["Fund UCN"])
+    else:
+        got = result.reset_index(drop=True).reindex(range(len(expected)))
+
+    values = result_values(got)
+    if values is None:
+        return 0.0
+    nav, mtd = values
+
+    correct = (
+        (abs(nav - expected["NAV"].to_numpy()) <= NAV_TOLERANCE)
+        & (abs(mtd - expected["MTD"].to_numpy()) <= MTD_TOLERANCE)
+    )
+    return float(correct.sum()) / len(expected)
+
+
+def check_scoring(truth, workflow_path):
+    """
+    score() must give a known-correct result 1.0 and a wrong one less.
+    The correct result is the ground truth in a workflow variant's shape
+    (workbook columns such as "NAV (thous)" carried through), so a
+    column picker that reads the wrong NAV fails here, not silently in
+    every accuracy figure. Raises ValueError otherwise.
+    """
+    funds = pd.DataFrame(truth["funds"])
+    wf = pd.read_excel(workflow_path)
+    correct = wf.merge(funds[["Fund UCN", "NAV", "MTD"]], on="Fund UCN")
+    correct["Variance"] = abs(correct["MTD"])
+
+    wrong = correct.copy()
+    wrong["NAV"] = wrong["NAV"] * 2
+
+    got = score(correct, truth), score(wrong, truth)
+    if got[0] != 1.0 or got[1] >= 1.0:
+        raise ValueError(f"benchmark.score is broken: correct={got[0]}, wrong={got[1]}")
+
+
+def _cold_run(extract, pdf_path, workflow_path, trace):
+    # Fresh cache root per run: no char cache, templates or NAV history
+    # carried over from the previous variant
+    previous = os.environ.get("ARENA_CACHE_DIR")
+    root = tempfile.mkdtemp(prefix="arena_bench_")
+    os.environ["ARENA_CACHE_DIR"] = root
+    clear_memory()
+
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    # A bug in a variant (anything outside EXTRACTION_ERRORS) stops the
+    # benchmark, but still leaves the environment as it was
+    try:
+        try:
+            result, error = call_extractor(extract, pdf_path, workflow_path), None
+        except EXTRACTION_ERRORS as exc:
+            result, error = None, f"{type(exc).__name__}: {exc}"
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    finally:
+        if trace:
+            tracemalloc.stop()
+        if previous is None:
+            os.environ.pop("ARENA_CACHE_DIR", None)
+        else:
+            os.environ["ARENA_CACHE_DIR"] = previous
+        shutil.rmtree(root, ignore_errors=True)
+
+    return result, error, elapsed, peak
+
+
+def bench_variant(variant, pdf_path, workflow_path, truth, repeat=1):
+    """Wall time (best of repeat), peak traced memory and accuracy of one variant."""
+    extract = load_extractor(variant)
+
+    # Timing runs without tracemalloc: it slows pdfminer down several-fold
+    times = []
+    for _ in range(repeat):
+        result, error, elapsed, _ = _cold_run(extract, pdf_path, workflow_path, trace=False)
+        times.append(elapsed)
+
+    _, _, _, peak = _cold_run(extract, pdf_path, workflow_path, trace=True)
+
+    if error is None and not isinstance(result, pd.DataFrame):
+        # The gemini scripts return a message string instead of raising
+        error = str(result)
+
+    return {
+        "variant": variant,
+        "funds": truth["fund_count"],
+        "seconds": min(times),
+        "peak_mb": peak / 2**20,
+        "accuracy": score(result, truth),
+        "error": error,
+    }
+
+
+def run_benchmark(variants=None, fund_counts=FUND_COUNTS, folder=None,
+                  repeat=1, **statement_kw):
+    """
+    Generates one synthetic statement per fund count and runs every variant
+    on it. statement_kw goes to make_statement (page_count, kerning, ...).
+    """
+    variants = list(variants or VARIANTS)
+    folder = folder or tempfile.mkdtemp(prefix="arena_synthetic_")
+
+    records = []
+    for fund_count in fund_counts:
+        pdf_path, workflow_path, truth_path = make_statement(
+            folder, fund_count=fund_count, **statement_kw
+        )
+        with open(truth_path) as f:
+            truth = json.load(f)
+        check_scoring(truth, workflow_path)
+
+        for variant in variants:
+            records.append(bench_variant(variant, pdf_path, workflow_path, truth, repeat))
+
+    return pd.DataFrame(records)
+
+
+def bench_backends(backends=None, fund_counts=FUND_COUNTS, folder=None,
+                   repeat=3, page_count=5, **statement_kw):
+    """
+    Uncached char-layer parse time per page for each pdf_backend, with the
+    speedup over pdfplumber, on the same synthetic statements.
+    """
+    backends = list(backends or BACKENDS)
+    folder = folder or tempfile.mkdtemp(prefix="arena_synthetic_")
+
+    records = []
+    for fund_count in fund_counts:
+        pdf_path, _, _ = make_statement(
+            folder, fund_count=fund_count, page_count=page_count, **statement_kw
+        )
+        for backend in backends:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                pages = list(iter_page_chars(pdf_path, backend=backend))
+                times.append(time.perf_counter() - start)
+            records.append({
+                "backend": backend,
+                "funds": fund_count,
+                "pages": len(pages),
+                "chars": sum(len(p) for p in pages),
+                "seconds_per_page": min(times) / max(len(pages), 1),
+            })
+
+    df = pd.DataFrame(records)
+    base = df[df["backend"] == "pdfplumber"].set_index("funds")["seconds_per_page"]
+    df["speedup"] = df["funds"].map(base) / df["seconds_per_page"]
+    return df
+
+
+def bench_char_memory(page_count=50, fund_count=50, folder=None, **statement_kw):
+    """
+    Traced bytes for a whole statement: held as char dicts, vs the peak
+    and held size of stream_rows() (the extractors' path) on a cold and
+    on a warm char cache.
+    """
+    folder = folder or tempfile.mkdtemp(prefix="arena_synthetic_")
+    pdf_path, _, _ = make_statement(
+        folder, fund_count=fund_count, page_count=page_count, **statement_kw
+    )
+    cache = tempfile.mkdtemp(prefix="arena_chars_")
+
+    def traced(build):
+        tracemalloc.start()
+        data = build()
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return data, held, peak
+
+    def as_dicts():
+        return [c for page in iter_page_chars(pdf_path) for c in page]
+
+    def streamed():
+        # Never complete: every page goes through the stream
+        return stream_rows(pdf_path, lambda rows: False, cache=cache)[0]
+
+    try:
+        chars, dict_bytes, _ = traced(as_dicts)
+        del chars
+        table, table_bytes, cold_peak = traced(streamed)
+        _, _, warm_peak = traced(streamed)
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+    return {
+        "pages": page_count,
+        "chars": len(table),
+        "dict_mb": dict_bytes / 2**20,
+        "table_mb": table_bytes / 2**20,
+        "cold_peak_mb": cold_peak / 2**20,
+        "warm_peak_mb": warm_peak / 2**20,
+        "ratio": dict_bytes / max(table_bytes, 1),
+    }
+
+
+def summarize(results):
+    """One row per variant, one column per fund count, for each metric."""
+    return results.pivot_table(
+        index="variant", columns="funds", values=["seconds", "peak_mb", "accuracy"]
+    )
+
+
+# results = run_benchmark(kerning=0.2, watermark=30, multiline_headers=True, page_count=3)
+# print(summarize(results).round(3).to_string())
+# print(bench_backends(page_count=10).round(5).to_string())
+# print(bench_char_memory(page_count=50))
@@ -1,75 +1,56 @@
-import pdfplumber
-import pandas as pd
 import re
-from collections import defaultdict
+
+from instrumentation import mark
+from page_stream import stream_rows
+from row_features import classify_rows, nav_mtd_values
+from tokenizer import row_values
+from workflow_cache import load_workflow
 
 def extract_arena(file_path, workflow_path):
 
     # --------------------------------------------------
     # 1. Read workflow
     # --------------------------------------------------
-    wf = pd.read_excel(workflow_path)
+    wf = load_workflow(workflow_path, columns=["Fund UCN", "Fund Name"])
     wf = wf[wf["Fund Name"].str.contains("Arena", case=False, na=False)]
     wf = wf.reset_index(drop=True)
     fund_count = len(wf)
 
     if fund_count == 0:
         raise ValueError("Arena: No Arena funds in workflow")
+    mark("workflow", funds=len(wf))
 
     # --------------------------------------------------
-    # 2. Read PDF characters
+    # 2. Merge characters into typed tokens (tight digit
+    #    spacing, spaces kept inside a token)
     # --------------------------------------------------
-    chars = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            chars.extend(page.chars)
-
-    if not chars:
-        raise ValueError("Arena PDF: No text extracted")
+    def values(row):
+        return row_values(row, text_gap=2, numeric_gap=2, split_on_space=False)
 
     # --------------------------------------------------
-    # 3. Group chars into rows
+    # 3. Row finder: NAV row / MTD row (each page's rows are
+    #    tokenized once, as the page arrives, top-down)
     # --------------------------------------------------
-    rows = defaultdict(list)
-    for c in chars:
-        rows[round(c["top"], 1)].append(c)
+    features = []
+
+    def add_page(page_rows):
+        page_features = classify_rows(page_rows, extra=values)
+        features.extend(sorted(page_features, key=lambda f: f["top"]))
+        return None not in nav_mtd_values(features, fund_count)
 
     # --------------------------------------------------
-    # 4. Merge characters into numeric tokens
+    # 4. Stream pages into rows; stop once both rows are found
     # --------------------------------------------------
-    def build_tokens(row):
-        row = sorted(row, key=lambda x: x["x0"])
-        tokens = []
-        current = [row[0]]
-
-        for c in row[1:]:
-            if c["x0"] - current[-1]["x1"] <= 2:  # tight digit spacing
-                current.append(c)
-            else:
-                tokens.append(current)
-                current = [c]
+    chars, rows, pages_parsed = stream_rows(file_path, add_page)
 
-        tokens.append(current)
-        return tokens
+    if not chars:
+        raise ValueError("Arena PDF: No text extracted")
+    mark("parse", chars=len(chars), rows=len(rows), pages=pages_parsed)
 
     # --------------------------------------------------
     # 5. Find NAV row
     # --------------------------------------------------
-    nav_values = None
-
-    for row in sorted(rows.values(), key=lambda r: r[0]["top"]):
-        tokens = build_tokens(row)
-        values = []
-
-        for tok in tokens:
-            text = "".join(c["text"] for c in tok).replace(",", "").strip()
-            if "/" in text or not text.isdigit():
-                continue
-            values.append(float(text))
-
-        if len(values) >= fund_count:
-            nav_values = values[:fund_count]
-            break
+    nav_values, mtd_values = nav_mtd_values(features, fund_count)
 
     if nav_values is None:
         raise ValueError("Arena PDF: NAV row not found")
@@ -77,27 +58,9 @@ def extract_arena(file_path, workflow_path):
     # --------------------------------------------------
     # 6. Find MTD row
     # --------------------------------------------------
-    mtd_values = None
-
-    for row in sorted(rows.values(), key=lambda r: r[0]["top"]):
-        tokens = build_tokens(row)
-        values = []
-
-        for tok in tokens:
-            text = "".join(c["text"] for c in tok).replace("%", "").strip()
-            if "/" in text:
-                continue
-            try:
-                values.append(float(text))
-            except ValueError:
-                continue
-
-        if len(values) >= fund_count:
-            mtd_values = values[:fund_count]
-            break
-
     if mtd_values is None:
         raise ValueError("Arena PDF: MTD row not found")
+    mark("row_detection", nav=len(nav_values), mtd=len(mtd_values))
 
     # --------------------------------------------------
     # 7. Output
@@ -105,5 +68,7 @@ def extract_arena(file_path, workflow_path):
     wf["NAV"] = nav_values
     wf["MTD"] = mtd_values
     wf["Variance"] = abs(wf["MTD"])
+    wf.attrs["pages_parsed"] = pages_parsed
+    mark("output", funds=len(wf))
 
     return wf
@@ -1,125 +1,69 @@
-import pdfplumber
-import pandas as pd
-from collections import defaultdict
+from instrumentation import mark
+from page_stream import stream_rows
+from row_features import classify_rows, nav_mtd_values
+from tokenizer import row_values
+from workflow_cache import load_workflow
 
 def extract_arena(file_path, workflow_path):
 
     # --------------------------------------------------
     # 1. Read workflow (Arena funds only)
     # --------------------------------------------------
-    wf = pd.read_excel(workflow_path)
+    wf = load_workflow(workflow_path, columns=["Fund UCN", "Fund Name"])
     wf = wf[wf["Fund Name"].str.contains("Arena", case=False, na=False)]
     wf = wf.reset_index(drop=True)
     fund_count = len(wf)
 
     if fund_count == 0:
         raise ValueError("Arena: No Arena funds found in workflow")
+    mark("workflow", funds=len(wf))
 
     # --------------------------------------------------
-    # 2. Read all characters from PDF
+    # 2. Row finder: first valid NAV / MTD row
+    #    (each page's rows are tokenized once as the page
+    #    arrives, typed tokens; NAV must be large: skips
+    #    10, 1, 2025, etc.)
     # --------------------------------------------------
-    chars = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            chars.extend(page.chars)
+    features = []
 
-    if not chars:
-        raise ValueError("Arena PDF: No text extracted")
-
-    # --------------------------------------------------
-    # 3. Group characters into rows (by Y)
-    # --------------------------------------------------
-    rows = defaultdict(list)
-    for c in chars:
-        rows[round(c["top"], 1)].append(c)
+    def add_page(page_rows):
+        page_features = classify_rows(
+            page_rows, extra=lambda row: row_values(row, min_nav=100000)
+        )
+        features.extend(sorted(page_features, key=lambda f: f["top"]))
+        return None not in nav_mtd_values(features, fund_count)
 
     # --------------------------------------------------
-    # 4. Build numeric tokens (merge digits + commas)
+    # 3. Stream pages into rows; stop once both rows are found
     # --------------------------------------------------
-    def build_numeric_tokens(row):
-        row = sorted(row, key=lambda x: x["x0"])
-        tokens = []
-        current = [row[0]]
-
-        for c in row[1:]:
-            prev = current[-1]
+    chars, rows, pages_parsed = stream_rows(file_path, add_page)
 
-            # merge digits and commas regardless of spacing
-            if (
-                (prev["text"].isdigit() or prev["text"] == ",")
-                and (c["text"].isdigit() or c["text"] == ",")
-            ):
-                current.append(c)
-            else:
-                tokens.append(current)
-                current = [c]
-
-        tokens.append(current)
-        return tokens
+    if not chars:
+        raise ValueError("Arena PDF: No text extracted")
+    mark("parse", chars=len(chars), rows=len(rows), pages=pages_parsed)
 
     # --------------------------------------------------
-    # 5. Extract NAV row (first valid one)
+    # 4. Extract NAV row (first valid one)
     # --------------------------------------------------
-    nav_values = None
-
-    for row in sorted(rows.values(), key=lambda r: r[0]["top"]):
-        tokens = build_numeric_tokens(row)
-        values = []
-
-        for tok in tokens:
-            text = "".join(c["text"] for c in tok).replace(",", "").strip()
-
-            # skip dates or garbage
-            if not text.isdigit():
-                continue
-
-            # skip date fragments like 10, 1, 2025
-            if len(text) < 6:
-                continue
-
-            values.append(float(text))
-
-        if len(values) >= fund_count:
-            nav_values = values[:fund_count]
-            break
+    nav_values, mtd_values = nav_mtd_values(features, fund_count)
 
     if nav_values is None:
         raise ValueError("Arena PDF: NAV row not found")
 
     # --------------------------------------------------
-    # 6. Extract MTD row (first valid one)
+    # 5. Extract MTD row (first valid one)
     # --------------------------------------------------
-    mtd_values = None
-
-    for row in sorted(rows.values(), key=lambda r: r[0]["top"]):
-        tokens = build_numeric_tokens(row)
-        values = []
-
-        for tok in tokens:
-            text = "".join(c["text"] for c in tok).replace("%", "").strip()
-
-            if not text:
-                continue
-            if "/" in text:
-                continue
-
-            try:
-                values.append(float(text))
-            except ValueError:
-                continue
-
-        if len(values) >= fund_count:
-            mtd_values = values[:fund_count]
-            break
-
     if mtd_values is None:
         raise ValueError("Arena PDF: MTD row not found")
+    mark("row_detection", nav=len(nav_values), mtd=len(mtd_values))
 
     # --------------------------------------------------
-    # 7. Build final output
+    # 6. Build final output
     # --------------------------------------------------
     wf["NAV"] = nav_values
     wf["MTD"] = mtd_values
     wf["Variance"] = abs(wf["MTD"])
+    wf.attrs["pages_parsed"] = pages_parsed
+    mark("output", funds=len(wf))
 
     return wf
@@ -0,0 +1,35 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Shared root for every on-disk cache (chars, workflow snapshots, ...)
+DEFAULT_CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "arena_check")
+
+
+def cache_dir(name):
+    """Returns (and creates) one named cache folder under ARENA_CACHE_DIR."""
+    root = os.environ.get("ARENA_CACHE_DIR", DEFAULT_CACHE_ROOT)
+    path = os.path.join(root, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """
+    Opens a temp file next to path and renames it over path on success.
+    The temp name is unique per call, so processes writing the same file
+    never share (and race on) one ".tmp" path; the last rename wins.
+    """
+    folder, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from char_cache import load_pages
+from extractors import EXTRACTION_ERRORS, call_extractor, load_extractor
+from layout_template import layout_fingerprint, load_template, save_template
+from workflow_cache import load_workflow
+
+# --------------------------------------------------
+# Existing extractors as strategies, with a relative cost
+# (roughly: pages read x work per row). Cheapest first.
+# --------------------------------------------------
+STRATEGIES = (
+    ("abc", 1.0),                # numeric density, first page only
+    ("newest_extract", 2.0),     # fund-name anchors, streamed pages
+    ("new_extract_arena", 3.0),  # column clustering, streamed pages
+    ("gemini_logic6", 4.0),      # word geometry, header slices
+)
+
+TEMPLATE_KEY = "cascade"
+
+
+def _numbers(values):
+    text = pd.Series(values).astype(str).str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+
+
+# Workbook columns that start like the extracted NAV but are not it
+NOT_EXTRACTED = ("NAV Date", "NAV (thous)", "Prev NAV")
+
+
+def _pick(df, name, prefixes, exclude=()):
+    # The exact name wins; prefixes only cover variants that call it
+    # something else ("AUM (NAV)", "MTD Return")
+    columns = [col for col in df.columns if str(col) not in exclude]
+    for col in columns:
+        if str(col).strip().upper() == name:
+            return col
+    for col in columns:
+        if any(str(col).upper().startswith(p) for p in prefixes):
+            return col
+    return None
+
+
+def result_values(result):
+    """
+    (NAV, MTD) float arrays from any variant's output, whatever it names
+    the columns ("NAV", "AUM (NAV)", "MTD Return", ...); None if absent.
+    Workbook inputs carried through ("NAV (thous)", "Prev NAV") never count.
+    """
+    if not isinstance(result, pd.DataFrame):
+        return None
+
+    nav_col = _pick(result, "NAV", ("NAV", "AUM"), exclude=NOT_EXTRACTED)
+    mtd_col = _pick(result, "MTD", ("MTD",))
+    if nav_col is None or mtd_col is None:
+        return None
+
+    return _numbers(result[nav_col]), _numbers(result[mtd_col])
+
+
+def validate(result, expected_rows):
+    """None when the result passes the shared checks, else the reason."""
+    if not isinstance(result, pd.DataFrame):
+        # The gemini scripts return a message instead of raising
+        return str(result)
+
+    values = result_values(result)
+    if values is None:
+        return "no NAV / MTD columns"
+
+    nav, mtd = values
+    if len(nav) != len(mtd):
+        return f"NAV={len(nav)}, MTD={len(mtd)}"
+    if len(nav) != expected_rows:
+        return f"{len(nav)} rows, workflow has {expected_rows}"
+    if np.isnan(nav).any() or np.isnan(mtd).any():
+        return "missing NAV or MTD values"
+    return None
+
+
+def _standardize(result, wf):
+    # Word-based strategies don't know the workflow: line their
+    # values up with the workflow rows, like the other variants do
+    if "Fund UCN" in result.columns:
+        return result
+
+    nav, mtd = result_values(result)
+    out = wf[["Fund UCN", "Fund Name"]].copy()
+    out["NAV"] = nav
+    out["MTD"] = mtd
+    out["Variance"] = abs(out["MTD"])
+    return out
+
+
+def strategy_order(fingerprint, strategies=STRATEGIES):
+    """Cheapest first, but the strategy that last won on this layout leads."""
+    ordered = [name for name, _ in sorted(strategies, key=lambda s: s[1])]
+    remembered = load_template(fingerprint, TEMPLATE_KEY)
+    if remembered and remembered.get("strategy") in ordered:
+        ordered.remove(remembered["strategy"])
+        ordered.insert(0, remembered["strategy"])
+    return ordered
+
+
+def extract_arena(file_path, workflow_path, strategies=STRATEGIES):
+    """
+    Tries the strategies in order on one parsed document and returns the
+    first result that passes validate(). attrs["strategy"] names the
+    winner, attrs["attempts"] lists (strategy, failure) for the losers.
+    """
+
+    # --------------------------------------------------
+    # 1. Parse once: every strategy reads from the char cache
+    # --------------------------------------------------
+    pages = load_pages(file_path)
+    if not pages or not pages[0]:
+        raise ValueError("Arena PDF: No text extracted")
+    fingerprint = layout_fingerprint(pages[0])
+
+    # --------------------------------------------------
+    # 2. Expected row count from the workflow
+    # --------------------------------------------------
+    wf = load_workflow(workflow_path, columns=["Fund UCN", "Fund Name"])
+    wf = wf[wf["Fund Name"].str.contains("Arena", case=False, na=False)]
+    wf = wf.reset_index(drop=True)
+
+    if wf.empty:
+        raise ValueError("Arena: No Arena funds in workflow")
+
+    # --------------------------------------------------
+    # 3. Cascade until one strategy validates
+    # --------------------------------------------------
+    attempts = []
+    for name in strategy_order(fingerprint, strategies):
+        try:
+            result = call_extractor(load_extractor(name), file_path, workflow_path)
+        except EXTRACTION_ERRORS as exc:
+            attempts.append((name, f"{type(exc).__name__}: {exc}"))
+            continue
+
+        failure = validate(result, len(wf))
+        if failure is not None:
+            attempts.append((name, failure))
+            continue
+
+        # --------------------------------------------------
+        # 4. Remember the winner for this layout
+        # --------------------------------------------------
+        if load_template(fingerprint, TEMPLATE_KEY) != {"strategy": name}:
+            save_template(fingerprint, TEMPLATE_KEY, {"strategy": name})
+
+        result = _standardize(result, wf)
+        result.attrs["strategy"] = name
+        result.attrs["attempts"] = attempts
+        return result
+
+    details = "; ".join(f"{name}: {failure}" for name, failure in attempts)
+    raise ValueError(f"Arena cascade: no strategy passed validation ({details})")
+
+
+# df = extract_arena("arena_report.pdf", "workflow.xlsx")
+# print(df.attrs["strategy"], df.attrs["attempts"])
@@ -0,0 +1,387 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from cache_paths import atomic_write, cache_dir
+from pdf_backend import DEFAULT_BACKEND, backend_name, page_count
+
+# Only the fields the extractors actually read are kept
+CHAR_FIELDS = ("text", "x0", "x1", "top", "bottom", "fontname", "size")
+FLOAT_FIELDS = ("x0", "x1", "top", "bottom", "size")
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+INDEX_FILE = "index.json"
+
+
+# --------------------------------------------------
+# Keys
+# --------------------------------------------------
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of the file contents (the cache key)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _page_spec(pages, bbox=None, backend=DEFAULT_BACKEND, first=None):
+    if first is not None:
+        # The first pages of a document whose stream stopped early
+        spec = f"first{first}"
+    else:
+        spec = "all" if pages is None else "p" + "-".join(str(p) for p in pages)
+    if bbox is not None:
+        spec += "_bbox" + "-".join(f"{v:g}" for v in bbox)
+    # Backends disagree slightly on coordinates, so they never share entries
+    if backend != DEFAULT_BACKEND:
+        spec += f"_{backend}"
+    return spec
+
+
+def _entry_path(folder, digest, pages, bbox=None, backend=DEFAULT_BACKEND, first=None):
+    return os.path.join(folder, f"{digest}.{_page_spec(pages, bbox, backend, first)}.npz")
+
+
+def _prefix_entries(folder, digest, bbox=None, backend=DEFAULT_BACKEND):
+    """Early-exit entries of one document as (page count, path), longest first."""
+    head = f"{digest}.first"
+    tail = _page_spec(None, bbox, backend)[len("all"):] + ".npz"
+
+    found = []
+    for name in os.listdir(folder):
+        if name.startswith(head) and name.endswith(tail):
+            count = name[len(head):len(name) - len(tail)]
+            if count.isdigit():
+                found.append((int(count), os.path.join(folder, name)))
+    return sorted(found, reverse=True)
+
+
+# --------------------------------------------------
+# Packing: list of pages of char dicts <-> flat arrays
+# --------------------------------------------------
+def pack_pages(pages):
+    """Flattens pages of char dicts into one dict of NumPy arrays."""
+    chars = [c for page in pages for c in page]
+    packed = {
+        "text": np.array([c["text"] for c in chars], dtype=str),
+        "fontname": np.array([c.get("fontname", "") for c in chars], dtype=str),
+        "page": np.repeat(
+            np.arange(len(pages), dtype=np.int32),
+            [len(page) for page in pages],
+        ),
+        "page_count": np.array([len(pages)], dtype=np.int32),
+    }
+    for field in FLOAT_FIELDS:
+        packed[field] = np.array([c[field] for c in chars], dtype=np.float64)
+    return packed
+
+
+def unpack_pages(packed):
+    """Rebuilds pages of (trimmed) char dicts from packed arrays."""
+    page_count = int(packed["page_count"][0])
+    columns = {field: packed[field].tolist() for field in CHAR_FIELDS}
+    page_ids = packed["page"].tolist()
+
+    pages = [[] for _ in range(page_count)]
+    for i, page_id in enumerate(page_ids):
+        pages[page_id].append({field: columns[field][i] for field in CHAR_FIELDS})
+    return pages
+
+
+# --------------------------------------------------
+# PDF parse (the slow path, through pdf_backend)
+# --------------------------------------------------
+def parse_pages(file_path, pages=None, bbox=None, backend=None, workers=None):
+    # workers > 1 (or ARENA_PARSE_WORKERS) splits the pages over processes
+    from parallel_parse import iter_parallel_pages
+
+    return list(iter_parallel_pages(file_path, pages, bbox, backend, workers))
+
+
+# --------------------------------------------------
+# Index (path -> digest) used by replay mode
+# --------------------------------------------------
+def _read_index(folder):
+    try:
+        with open(os.path.join(folder, INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _remember(folder, file_path, digest):
+    index = _read_index(folder)
+    index[os.path.abspath(file_path)] = digest
+    index[os.path.basename(file_path)] = digest
+    with atomic_write(os.path.join(folder, INDEX_FILE)) as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+
+
+def _replay_digest(folder, file_path):
+    if os.path.exists(file_path):
+        return file_digest(file_path)
+    index = _read_index(folder)
+    digest = index.get(os.path.abspath(file_path)) or index.get(os.path.basename(file_path))
+    if digest is None:
+        raise FileNotFoundError(f"Arena char cache: no replay entry for {file_path}")
+    return digest
+
+
+# --------------------------------------------------
+# LRU eviction (mtime is bumped on every hit). Other processes
+# share the folder, so entries may vanish under us at any point.
+# --------------------------------------------------
+def _evict(folder, max_bytes):
+    entries = []
+    for name in os.listdir(folder):
+        if name.endswith(".npz"):
+            path = os.path.join(folder, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# --------------------------------------------------
+# Public entry points
+# --------------------------------------------------
+def _settings(cache, max_bytes, replay):
+    folder = cache or cache_dir("chars")
+    os.makedirs(folder, exist_ok=True)
+    if max_bytes is None:
+        max_bytes = int(os.environ.get("ARENA_CHAR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+    if replay is None:
+        replay = os.environ.get("ARENA_CHAR_CACHE_REPLAY") == "1"
+    return folder, max_bytes, replay
+
+
+def _store(folder, file_path, digest, entry, packed, max_bytes):
+    with atomic_write(entry, "wb") as f:
+        np.savez_compressed(f, **packed)
+    _remember(folder, file_path, digest)
+    _evict(folder, max_bytes)
+
+
+def _load(file_path, pages, bbox, cache, max_bytes, replay, backend, workers,
+          from_packed, from_parsed):
+    # from_packed(packed, page_subset) / from_parsed(pages) shape the result
+    folder, max_bytes, replay = _settings(cache, max_bytes, replay)
+    backend = backend_name(backend)
+
+    pages = None if pages is None else tuple(pages)
+    bbox = None if bbox is None else tuple(bbox)
+    digest = _replay_digest(folder, file_path) if replay else file_digest(file_path)
+    entry = _entry_path(folder, digest, pages, bbox, backend)
+
+    # (evicted by another process between the check and the read: a miss)
+    try:
+        os.utime(entry)
+        with np.load(entry, allow_pickle=False) as packed:
+            return from_packed(packed, None)
+    except FileNotFoundError:
+        pass
+
+    # A whole-document entry, or the first pages a stream left behind
+    # when it stopped early, may already hold the requested pages
+    if pages is not None:
+        held = [_entry_path(folder, digest, None, bbox, backend)]
+        held += [path for count, path in _prefix_entries(folder, digest, bbox, backend)
+                 if max(pages) < count]
+        for path in held:
+            try:
+                os.utime(path)
+                with np.load(path, allow_pickle=False) as packed:
+                    if max(pages) < int(packed["page_count"][0]):
+                        return from_packed(packed, pages)
+            except FileNotFoundError:
+                continue
+
+    if replay:
+        raise FileNotFoundError(f"Arena char cache: {file_path} not cached ({digest[:12]})")
+
+    parsed = parse_pages(file_path, pages, bbox, backend, workers)
+    _store(folder, file_path, digest, entry, pack_pages(parsed), max_bytes)
+
+    return from_parsed(parsed)
+
+
+def _pages_from_packed(packed, subset):
+    parsed = unpack_pages(packed)
+    return parsed if subset is None else [parsed[p] for p in subset]
+
+
+def load_pages(file_path, pages=None, bbox=None, cache=None, max_bytes=None,
+               replay=None, backend=None, workers=None):
+    """
+    Returns a list of pages, each a list of char dicts with CHAR_FIELDS.
+    Served from the SHA-256 keyed .npz cache when possible; replay mode
+    (ARENA_CHAR_CACHE_REPLAY=1) never opens the PDF. With a bbox
+    (x0, top, x1, bottom) only chars inside that region are kept.
+    backend picks the pdf_backend parser (ARENA_PDF_BACKEND), workers the
+    processes per document for a cache miss (ARENA_PARSE_WORKERS).
+    """
+    return _load(
+        file_path, pages, bbox, cache, max_bytes, replay, backend, workers,
+        _pages_from_packed, lambda parsed: parsed,
+    )
+
+
+def load_table(file_path, pages=None, bbox=None, cache=None, max_bytes=None,
+               replay=None, backend=None, workers=None):
+    """load_pages() as one CharTable; cache hits never build char dicts."""
+    from char_table import CharTable
+
+    return _load(
+        file_path, pages, bbox, cache, max_bytes, replay, backend, workers,
+        lambda packed, subset: CharTable.from_packed(packed).select_pages(subset),
+        CharTable.from_pages,
+    )
+
+
+def _read_prefix(folder, digest, bbox, backend):
+    # Longest early-exit entry still on disk: (path, CharTable) or (None, empty table)
+    from char_table import CharTable
+
+    for _, path in _prefix_entries(folder, digest, bbox, backend):
+        try:
+            os.utime(path)
+            with np.load(path, allow_pickle=False) as packed:
+                return path, CharTable.from_packed(packed)
+        except FileNotFoundError:
+            continue
+    return None, CharTable()
+
+
+def iter_pages(file_path, bbox=None, cache=None, max_bytes=None, replay=None,
+               backend=None, workers=None):
+    """
+    Yields each page's chars lazily, as CharRow views of one CharTable.
+    A cached document is replayed from the cache; otherwise pages are
+    parsed one at a time and appended to the table as they arrive, so
+    only the newest page exists as char dicts. When the caller stops
+    early, the pages parsed so far are cached as a "first<k>" entry that
+    load_pages() serves and the next iter_pages() replays before it
+    parses on from page k.
+    """
+    folder, max_bytes, replay = _settings(cache, max_bytes, replay)
+    backend = backend_name(backend)
+
+    bbox = None if bbox is None else tuple(bbox)
+    digest = _replay_digest(folder, file_path) if replay else file_digest(file_path)
+    entry = _entry_path(folder, digest, None, bbox, backend)
+
+    if os.path.exists(entry):
+        prefix, table = None, None
+    else:
+        prefix, table = _read_prefix(folder, digest, bbox, backend)
+    if table is None or (replay and prefix is None):
+        # Cached: page views of one CharTable, no per-char dicts
+        yield from load_table(
+            file_path, bbox=bbox, cache=folder, max_bytes=max_bytes,
+            replay=replay, backend=backend,
+        ).pages()
+        return
+
+    # With workers > 1 page ranges are parsed ahead in other processes,
+    # still yielded in order, so early exit keeps working
+    from char_table import CharRow
+    from parallel_parse import iter_parallel_pages
+
+    cached = table.page_count
+    complete = False
+    try:
+        yield from table.pages()
+        if replay:
+            raise FileNotFoundError(
+                f"Arena char cache: only {cached} pages of {file_path} cached ({digest[:12]})"
+            )
+
+        remaining = None if not cached else range(cached, page_count(file_path, backend))
+        for page_chars in iter_parallel_pages(file_path, remaining, bbox, backend, workers):
+            start = len(table)
+            table.extend(page_chars)
+            del page_chars
+            yield CharRow(table, np.arange(start, len(table)))
+        complete = True
+    finally:
+        # Runs on early exit (generator closed) too
+        if complete or table.page_count > cached:
+            first = None if complete else table.page_count
+            _store(
+                folder, file_path, digest,
+                _entry_path(folder, digest, None, bbox, backend, first),
+                table.to_packed(), max_bytes,
+            )
+            if prefix is not None:
+                # Superseded by the longer entry just written
+                try:
+                    os.remove(prefix)
+                except FileNotFoundError:
+                    pass
+
+
+def load_chars(file_path, first_page_only=False, **kwargs):
+    """All chars of the document (or of page 0) as one flat list."""
+    pages = load_pages(file_path, pages=(0,) if first_page_only else None, **kwargs)
+    return [c for page in pages for c in page]
+
+
+def chars_to_words(chars, x_tolerance=3, y_tolerance=3):
+    """Same grouping as pdfplumber's default extract_words(), on cached chars."""
+    words = []
+    if not chars:
+        return words
+
+    # Lines: cluster tops, each within y_tolerance of the previous one
+    ordered = sorted(chars, key=lambda c: c["top"])
+    lines = [[ordered[0]]]
+    for c in ordered[1:]:
+        if c["top"] - lines[-1][-1]["top"] <= y_tolerance:
+            lines[-1].append(c)
+        else:
+            lines.append([c])
+
+    def flush(current):
+        if current:
+            words.append({
+                "text": "".join(c["text"] for c in current),
+                "x0": min(c["x0"] for c in current),
+                "x1": max(c["x1"] for c in current),
+                "top": min(c["top"] for c in current),
+                "bottom": max(c["bottom"] for c in current),
+            })
+
+    for line in lines:
+        current = []
+        for c in sorted(line, key=lambda c: c["x0"]):
+            if c["text"].isspace():
+                flush(current)
+                current = []
+            elif current and c["x0"] > current[-1]["x1"] + x_tolerance:
+                flush(current)
+                current = [c]
+            else:
+                current.append(c)
+        flush(current)
+
+    return words
+
+
+def load_words(file_path, page_number=0, **kwargs):
+    """Words of one page, built from the char cache instead of pdfplumber."""
+    chars = load_pages(file_path, pages=(page_number,), **kwargs)[0]
+    return chars_to_words(chars)
@@ -0,0 +1,265 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from char_cache import CHAR_FIELDS, FLOAT_FIELDS
+from row_grouping import DEFAULT_Y_TOLERANCE, group_rows
+
+# --------------------------------------------------
+# Compact char storage: parallel NumPy columns, interned
+# font ids and one text buffer with offsets, instead of a
+# Python dict per glyph. Rows and pages are index views;
+# CharView makes one char look like the old dict, so the
+# dict-based helpers keep working unchanged.
+# --------------------------------------------------
+
+
+class CharView(Mapping):
+    """One char of a CharTable, read-only, with the char dict keys."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table, i):
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, key):
+        table = self._table
+        if key == "text":
+            return table.text_at(self._i)
+        if key == "fontname":
+            return table.fonts[table.font[self._i]]
+        if key in FLOAT_FIELDS:
+            return float(getattr(table, key)[self._i])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(CHAR_FIELDS)
+
+    def __len__(self):
+        return len(CHAR_FIELDS)
+
+    def __repr__(self):
+        return f"CharView({dict(self)!r})"
+
+
+class CharRow(Sequence):
+    """A run of chars (row, token, column, page) as indices into a table."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return CharRow(self.table, self.index[k])
+        return CharView(self.table, int(self.index[k]))
+
+    def __iter__(self):
+        table = self.table
+        for i in self.index.tolist():
+            yield CharView(table, i)
+
+    def column(self, field):
+        """One field for the whole run as an array (no per-char views)."""
+        return getattr(self.table, field)[self.index]
+
+    @property
+    def text(self):
+        return "".join(self.table.text_at(i) for i in self.index.tolist())
+
+
+class CharTable:
+    """
+    Growable columnar char store. extend() appends a page (char dicts or
+    a CharRow of another table) with amortised doubling, so a caller that
+    extends page by page never holds more than one page of dicts.
+    """
+
+    def __init__(self, capacity=1024):
+        self.n = 0
+        self.page_count = 0
+        self.fonts = []
+        self._font_ids = {}
+
+        self._cols = {f: np.empty(capacity, dtype=np.float64) for f in FLOAT_FIELDS}
+        self._font = np.empty(capacity, dtype=np.int32)
+        self._page = np.empty(capacity, dtype=np.int32)
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._text_parts = []
+        self._text = ""
+
+    # --------------------------------------------------
+    # Columns (views of the filled part)
+    # --------------------------------------------------
+    def __getattr__(self, name):
+        if name in FLOAT_FIELDS:
+            return self._cols[name][:self.n]
+        raise AttributeError(name)
+
+    @property
+    def font(self):
+        return self._font[:self.n]
+
+    @property
+    def page(self):
+        return self._page[:self.n]
+
+    @property
+    def offsets(self):
+        return self._offsets[:self.n + 1]
+
+    @property
+    def text(self):
+        if self._text_parts:
+            self._text = "".join([self._text] + self._text_parts)
+            self._text_parts = []
+        return self._text
+
+    def text_at(self, i):
+        return self.text[self._offsets[i]:self._offsets[i + 1]]
+
+    def __len__(self):
+        return self.n
+
+    def nbytes(self):
+        arrays = list(self._cols.values()) + [self._font, self._page, self._offsets]
+        return sum(a.nbytes for a in arrays) + len(self.text)
+
+    # --------------------------------------------------
+    # Building
+    # --------------------------------------------------
+    def _reserve(self, extra):
+        need = self.n + extra
+        capacity = len(self._font)
+        if need <= capacity:
+            return
+        while capacity < need:
+            capacity *= 2
+
+        def grow(a, size):
+            out = np.empty(size, dtype=a.dtype)
+            out[:len(a)] = a
+            return out
+
+        self._cols = {f: grow(a, capacity) for f, a in self._cols.items()}
+        self._font = grow(self._font, capacity)
+        self._page = grow(self._page, capacity)
+        self._offsets = grow(self._offsets, capacity + 1)
+
+    def _font_id(self, name):
+        fid = self._font_ids.get(name)
+        if fid is None:
+            fid = self._font_ids[name] = len(self.fonts)
+            self.fonts.append(name)
+        return fid
+
+    def extend(self, page_chars):
+        """Appends one page's chars as the next page."""
+        k = len(page_chars)
+        self._reserve(k)
+        lo, hi = self.n, self.n + k
+
+        if isinstance(page_chars, CharRow):
+            src, idx = page_chars.table, page_chars.index
+            for f in FLOAT_FIELDS:
+                self._cols[f][lo:hi] = getattr(src, f)[idx]
+            remap = np.array([self._font_id(name) for name in src.fonts], dtype=np.int32)
+            self._font[lo:hi] = remap[src.font[idx]] if len(remap) else 0
+            texts = [src.text_at(i) for i in idx.tolist()]
+        else:
+            for f in FLOAT_FIELDS:
+                self._cols[f][lo:hi] = [c[f] for c in page_chars]
+            self._font[lo:hi] = [self._font_id(c.get("fontname", "")) for c in page_chars]
+            texts = [c["text"] for c in page_chars]
+
+        self._page[lo:hi] = self.page_count
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=k)
+        self._offsets[lo + 1:hi + 1] = self._offsets[lo] + np.cumsum(lengths)
+        self._text_parts.append("".join(texts))
+
+        self.n = hi
+        self.page_count += 1
+
+    @classmethod
+    def from_pages(cls, pages):
+        table = cls(capacity=max(sum(len(p) for p in pages), 1))
+        for page_chars in pages:
+            table.extend(page_chars)
+        return table
+
+    @classmethod
+    def from_packed(cls, packed):
+        """Straight from char_cache's packed arrays, no dicts in between."""
+        text = packed["text"]
+        n = len(text)
+        table = cls(capacity=max(n, 1))
+
+        for f in FLOAT_FIELDS:
+            table._cols[f][:n] = packed[f]
+
+        fonts, font_ids = np.unique(packed["fontname"], return_inverse=True)
+        table.fonts = fonts.tolist()
+        table._font_ids = {name: i for i, name in enumerate(table.fonts)}
+        table._font[:n] = font_ids
+
+        table._page[:n] = packed["page"]
+        table._offsets[1:n + 1] = np.cumsum(np.char.str_len(text)) if n else []
+        table._text = "".join(text.tolist())
+
+        table.n = n
+        table.page_count = int(packed["page_count"][0])
+        return table
+
+    # --------------------------------------------------
+    # Views
+    # --------------------------------------------------
+    def pages(self):
+        """One CharRow per page, in page order."""
+        bounds = np.searchsorted(self.page, np.arange(self.page_count + 1))
+        return [
+            CharRow(self, np.arange(bounds[p], bounds[p + 1]))
+            for p in range(self.page_count)
+        ]
+
+    def select_pages(self, pages):
+        """A new table with just these pages (renumbered 0..k-1)."""
+        if pages is None:
+            return self
+        all_pages = self.pages()
+        return CharTable.from_pages([all_pages[p] for p in pages])
+
+    def rows(self, y_tolerance=DEFAULT_Y_TOLERANCE, start=0):
+        """
+        Same shape as group_char_rows(): {row top: CharRow sorted by x0}.
+        start groups only the chars from that index on (e.g. the last page).
+        """
+        if start >= self.n:
+            return {}
+        row_tops, row_slices = group_rows(self.top[start:], self.x0[start:], y_tolerance)
+        return {
+            round(float(y), 1): CharRow(self, idx + start)
+            for y, idx in zip(row_tops, row_slices)
+        }
+
+    def to_packed(self):
+        """The char_cache pack_pages() arrays, straight from the columns."""
+        text = self.text
+        offsets = self.offsets.tolist()
+        packed = {
+            "text": np.array([text[a:b] for a, b in zip(offsets, offsets[1:])], dtype=str),
+            "fontname": np.array(self.fonts or [""], dtype=str)[self.font],
+            "page": self.page.copy(),
+            "page_count": np.array([self.page_count], dtype=np.int32),
+        }
+        for f in FLOAT_FIELDS:
+            packed[f] = getattr(self, f).copy()
+        return packed
+
+    def to_dicts(self):
+        return [dict(CharView(self, i)) for i in range(self.n)]
@@ -0,0 +1,57 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
+def nearest_columns(centers, xs):
+    """
+    Index of the nearest center for every x, in one vectorized call.
+    Ties go to the lowest center index, like min(range(len(centers)), ...).
+    """
+    centers = np.asarray(centers, dtype=np.float64)
+    xs = np.asarray(xs, dtype=np.float64)
+    if len(centers) == 0:
+        raise ValueError("Arena columns: no column centers to assign to")
+
+    order = np.argsort(centers, kind="stable")
+    sorted_centers = centers[order]
+
+    # Neighbours on either side of x in the sorted centers
+    right = np.searchsorted(sorted_centers, xs, side="left")
+    right = np.minimum(right, len(centers) - 1)
+    left = np.maximum(right - 1, 0)
+    # Equal centers: the stable sort puts the lowest index first
+    left = np.searchsorted(sorted_centers, sorted_centers[left], side="left")
+
+    d_left = np.abs(xs - sorted_centers[left])
+    d_right = np.abs(xs - sorted_centers[right])
+    take_right = (d_right < d_left) | ((d_right == d_left) & (order[right] < order[left]))
+
+    return np.where(take_right, order[right], order[left])
+
+
+def cluster_columns(row, tol=8):
+    """
+    Greedy x-center clustering: each char joins the first column whose seed
+    center is within tol, else seeds a new one. Same result as scanning
+    every column, found with bisect over the (ascending) seed centers.
+    """
+    cols = []
+    seeds = []
+
+    for c in sorted(row, key=lambda x: (x["x0"] + x["x1"]) / 2):
+        cx = (c["x0"] + c["x1"]) / 2
+
+        # Seeds are <= cx, so candidates start at cx - tol; step back one
+        # so float rounding at the boundary matches abs(cx - seed) <= tol
+        i = max(bisect_left(seeds, cx - tol) - 1, 0)
+        while i < len(seeds) and abs(cx - seeds[i]) > tol:
+            i += 1
+
+        if i < len(seeds):
+            cols[i]["chars"].append(c)
+        else:
+            cols.append({"cx": cx, "chars": [c]})
+            seeds.append(cx)
+
+    return cols
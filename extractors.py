@@ -0,0 +1,83 @@
+import functools
+import importlib.util
+import inspect
+import os
+import sys
+
+# --------------------------------------------------
+# Extractor variants living side by side in this folder.
+# Loaded by file path: "abc" would otherwise resolve to the
+# stdlib module and "gemini _logic3.py" is not importable.
+# --------------------------------------------------
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The variants import the shared helpers (char_cache, ...) by name
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+VARIANTS = {
+    "abc": ("abc.py", "extract_arena"),
+    "extract_arena": ("extract_arena.py", "extract_arena"),
+    "new_extract": ("new_extract.py", "extract_arena"),
+    "new_extract_arena": ("new_extract_arena.py", "extract_arena"),
+    "bull": ("bull.py", "extract_arena"),
+    "bull_new": ("bull_new.py", "extract_arena"),
+    "newest_extract": ("newest_extract.py", "extract_arena"),
+    "gemini_logic": ("gemini_logic.py", "extract_arena_financials"),
+    "gemini_logic3": ("gemini _logic3.py", "extract_arena_final"),
+    "gemini_logic4": ("gemini_logic4.py", "extract_arena_fixed_final"),
+    "gemini_logic5": ("gemini_logic5.py", "extract_and_clean_arena"),
+    "gemini_logic6": ("gemini_logic6.py", "extract_arena_surgical"),
+    "cascade": ("cascade.py", "extract_arena"),
+}
+
+DEFAULT_VARIANT = "newest_extract"
+
+# What a statement or workbook the variants cannot handle raises: their
+# own ValueError checks (pdf_backend turns parser failures into ValueError
+# too), missing columns / values, unreadable files. Anything else is a bug
+# and is not reported as a failed statement.
+EXTRACTION_ERRORS = (ValueError, KeyError, IndexError, OSError)
+
+# Variants that parse every page before looking at any; the others read
+# page 0 only or stream and stop at the rows they need, where a page pool
+# just adds process startup and parses pages nobody reads
+WHOLE_DOCUMENT = {"cascade"}
+
+_loaded = {}
+
+
+def _profiled(name, extract):
+    # Import after sys.path is set up; profiling itself is
+    # switched on per call (ARENA_PROFILE=1)
+    from instrumentation import profile_call
+
+    @functools.wraps(extract)
+    def run(*args, **kwargs):
+        return profile_call(name, extract, *args, **kwargs)
+
+    return run
+
+
+def load_extractor(name=DEFAULT_VARIANT):
+    """Returns the extract function of one variant script."""
+    if name not in VARIANTS:
+        raise ValueError(f"Unknown extractor '{name}' (known: {', '.join(VARIANTS)})")
+
+    if name not in _loaded:
+        filename, func_name = VARIANTS[name]
+        spec = importlib.util.spec_from_file_location(
+            f"arena_variant_{name}", os.path.join(HERE, filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded[name] = _profiled(name, getattr(module, func_name))
+
+    return _loaded[name]
+
+
+def call_extractor(extract, file_path, workflow_path):
+    """Workflow variants take (pdf, workflow); the gemini scripts only the pdf."""
+    if len(inspect.signature(extract).parameters) >= 2:
+        return extract(file_path, workflow_path)
+    return extract(file_path)
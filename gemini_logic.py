@@ -1,10 +1,9 @@
-import pdfplumber
 import pandas as pd
 
+from table_region import table_words
+
 def extract_arena_financials(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
-        page = pdf.pages[0]
-        words = page.extract_words()
+    words = table_words(pdf_path)
 
     # 1. Group words by their vertical (top) position to identify rows
     # We will identify the specific rows for AUM and Net Returns by their dates
@@ -0,0 +1,377 @@
+import asyncio
+import json
+import os
+import shutil
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from batch_extract import _extract_one
+from cache_paths import atomic_write
+from char_cache import file_digest
+from extractors import DEFAULT_VARIANT
+from nav_history import append_history
+
+# --------------------------------------------------
+# Drop-folder service: PDFs land in inbox/, get extracted on
+# a bounded process pool, results go to outbox/, failures
+# to quarantine/. Same content twice is only extracted once.
+# --------------------------------------------------
+SEEN_FILE = "seen.json"
+LATENCY_WINDOW = 200
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _unique_path(folder, name):
+    path = os.path.join(folder, name)
+    stem, ext = os.path.splitext(name)
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(folder, f"{stem}.{n}{ext}")
+        n += 1
+    return path
+
+
+class IngestDaemon:
+    """
+    Watches inbox for *.pdf files (polling, or inotify when inotify_simple
+    is installed and watch="inotify"), waits until each file's size and
+    mtime have been unchanged for stable_for seconds, deduplicates by
+    SHA-256 and runs the extractor with at most max_workers in flight.
+    """
+
+    def __init__(self, inbox, workflow_path, outbox=None, quarantine=None,
+                 variant=DEFAULT_VARIANT, max_workers=None, poll_interval=2.0,
+                 stable_for=5.0, metrics_path=None, watch="poll"):
+        if watch not in ("poll", "inotify"):
+            raise ValueError("watch must be 'poll' or 'inotify'")
+
+        self.inbox = inbox
+        self.workflow_path = workflow_path
+        self.outbox = outbox or os.path.join(os.path.dirname(os.path.abspath(inbox)), "outbox")
+        self.quarantine = quarantine or os.path.join(os.path.dirname(os.path.abspath(inbox)), "quarantine")
+        self.variant = variant
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.stable_for = stable_for
+        self.metrics_path = metrics_path
+        self.watch = watch
+
+        for folder in (self.inbox, self.outbox, self.quarantine):
+            os.makedirs(folder, exist_ok=True)
+
+        # path -> (size, mtime_ns, unchanged since)
+        self._observed = {}
+        # paths queued or running, so a rescan does not queue them again
+        self._claimed = set()
+        self._seen = self._read_seen()
+        # digests queued or running (same content dropped twice in one burst)
+        self._pending = set()
+
+        self.queue = asyncio.Queue()
+        self.in_flight = 0
+        self.counts = {"done": 0, "failed": 0, "duplicate": 0}
+        self.scan_errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+        # Shared extraction pool (replaced when a worker process dies) and
+        # the lock that runs crash retries one file at a time
+        self._pool = None
+        self._isolate = None
+
+    # --------------------------------------------------
+    # Dedup store (digest -> result file), kept in the outbox
+    # --------------------------------------------------
+    def _seen_path(self):
+        return os.path.join(self.outbox, SEEN_FILE)
+
+    def _read_seen(self):
+        try:
+            with open(self._seen_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_seen(self):
+        with atomic_write(self._seen_path()) as f:
+            json.dump(self._seen, f, indent=1, sort_keys=True)
+
+    # --------------------------------------------------
+    # Metrics
+    # --------------------------------------------------
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "waiting_stable": len(self._observed) - len(self._claimed & set(self._observed)),
+            **self.counts,
+            "latency_last": self.latencies[-1] if latencies else None,
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "latency_max": latencies[-1] if latencies else None,
+            "scan_errors": self.scan_errors,
+        }
+
+    def write_metrics(self):
+        if not self.metrics_path:
+            return
+        stats = self.stats()
+        inbox = f'inbox="{_label(os.path.abspath(self.inbox))}"'
+        lines = []
+        for name in ("queue_depth", "in_flight", "waiting_stable"):
+            lines.append(f"# TYPE arena_ingest_{name} gauge")
+            lines.append(f"arena_ingest_{name}{{{inbox}}} {stats[name]}")
+        lines.append("# TYPE arena_ingest_files_total counter")
+        for outcome, count in self.counts.items():
+            lines.append(f'arena_ingest_files_total{{{inbox},outcome="{outcome}"}} {count}')
+        for name in ("latency_last", "latency_p50", "latency_max"):
+            lines.append(f"# TYPE arena_ingest_{name}_seconds gauge")
+            lines.append(f"arena_ingest_{name}_seconds{{{inbox}}} {float(stats[name] or 0):.3f}")
+        lines.append("# TYPE arena_ingest_scan_errors_total counter")
+        lines.append(f"arena_ingest_scan_errors_total{{{inbox}}} {self.scan_errors}")
+
+        # Best effort: a full disk must not stop the extractions
+        try:
+            with atomic_write(self.metrics_path) as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            pass
+
+    # --------------------------------------------------
+    # 1. Scan: stability check, then dedup by content hash
+    # --------------------------------------------------
+    async def _scan_file(self, entry, now):
+        path = entry.path
+        st = entry.stat()
+        key = (st.st_size, st.st_mtime_ns)
+        seen = self._observed.get(path)
+        if seen is None or seen[:2] != key:
+            # New or still being written: restart its clock
+            self._observed[path] = (*key, now)
+            return
+        if now - seen[2] < self.stable_for:
+            return
+
+        self._claimed.add(path)
+        digest = await asyncio.to_thread(file_digest, path)
+
+        if digest in self._seen or digest in self._pending:
+            self._move(path, os.path.join(self.outbox, "duplicates"))
+            self._claimed.discard(path)
+            self._observed.pop(path, None)
+            self.counts["duplicate"] += 1
+            return
+
+        self._pending.add(digest)
+        await self.queue.put((path, digest, seen[2]))
+
+    async def _scan(self):
+        now = time.monotonic()
+        present = set()
+
+        for entry in os.scandir(self.inbox):
+            if not entry.is_file() or not entry.name.lower().endswith(".pdf"):
+                continue
+            path = entry.path
+            present.add(path)
+            if path in self._claimed:
+                continue
+
+            try:
+                await self._scan_file(entry, now)
+            except OSError as exc:
+                # Deleted or moved away mid-scan, or unreadable: forget
+                # it, and quarantine it if it is still there
+                self._claimed.discard(path)
+                self._observed.pop(path, None)
+                if os.path.exists(path):
+                    self._quarantine(path, f"{type(exc).__name__}: {exc}")
+
+        # Files that vanished from the inbox (moved away by hand)
+        for path in list(self._observed):
+            if path not in present:
+                self._observed.pop(path, None)
+
+        self.write_metrics()
+
+    async def _watch(self, stop):
+        inotify = None
+        if self.watch == "inotify":
+            from inotify_simple import INotify, flags
+
+            inotify = INotify()
+            inotify.add_watch(self.inbox, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+
+        try:
+            while not stop.is_set():
+                try:
+                    await self._scan()
+                except OSError:
+                    # e.g. the inbox briefly unmounted: count it and
+                    # scan again next interval instead of stopping
+                    self.scan_errors += 1
+                    self.write_metrics()
+                if inotify is not None:
+                    # Wake on the next event, but still rescan every
+                    # interval so stability clocks keep running
+                    await asyncio.to_thread(inotify.read, int(self.poll_interval * 1000))
+                else:
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except TimeoutError:
+                        pass
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    # --------------------------------------------------
+    # 2. Workers: at most max_workers extractions in flight
+    # --------------------------------------------------
+    def _move(self, path, folder):
+        os.makedirs(folder, exist_ok=True)
+        target = _unique_path(folder, os.path.basename(path))
+        shutil.move(path, target)
+        return target
+
+    def _quarantine(self, path, error):
+        self.counts["failed"] += 1
+        try:
+            # The PDF may already be gone (deleted, or moved to the
+            # outbox before a later step failed): keep the error anyway
+            if os.path.exists(path):
+                target = self._move(path, self.quarantine)
+            else:
+                target = _unique_path(self.quarantine, os.path.basename(path))
+            with open(target + ".error.txt", "w") as f:
+                f.write(error + "\n")
+        except OSError:
+            # Quarantine unwritable: the failed count still shows it
+            pass
+
+    def _finish(self, path, digest, df):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        result = _unique_path(self.outbox, f"{stem}.csv")
+        try:
+            with atomic_write(result) as f:
+                df.to_csv(f, index=False)
+            append_history(df)
+            self._move(path, os.path.join(self.outbox, "pdf"))
+        except Exception:
+            # No result file for a statement that ends up in quarantine
+            if os.path.exists(result):
+                os.remove(result)
+            raise
+        self._seen[digest] = os.path.basename(result)
+        self._write_seen()
+        self.counts["done"] += 1
+
+    async def _extract(self, task):
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, _extract_one, task)
+        except BrokenProcessPool:
+            # A worker process died (OOM, segfault) and took every file in
+            # flight on the pool with it. Start a new pool, then retry this
+            # file alone on a pool of its own: only the file that kills
+            # that one too is to blame
+            if self._pool is pool:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        async with self._isolate:
+            solo = ProcessPoolExecutor(max_workers=1)
+            try:
+                return await loop.run_in_executor(solo, _extract_one, task)
+            except BrokenProcessPool as exc:
+                return task[0], None, f"{type(exc).__name__}: the worker process died on this file"
+            finally:
+                solo.shutdown(wait=False)
+
+    async def _worker(self):
+        while True:
+            path, digest, arrived = await self.queue.get()
+            self.in_flight += 1
+            self.write_metrics()
+            try:
+                task = (path, self.workflow_path, self.variant, 1)
+                _, df, error = await self._extract(task)
+                if error is None:
+                    try:
+                        self._finish(path, digest, df)
+                    except (OSError, ValueError) as exc:
+                        # Disk full, outbox move failed, history rejected the rows
+                        error = f"{type(exc).__name__}: {exc}"
+                if error is not None:
+                    self._quarantine(path, error)
+                self.latencies.append(time.monotonic() - arrived)
+            finally:
+                self.in_flight -= 1
+                self._claimed.discard(path)
+                self._observed.pop(path, None)
+                self._pending.discard(digest)
+                self.queue.task_done()
+                self.write_metrics()
+
+    # --------------------------------------------------
+    # 3. Run until stop is set (SIGINT / SIGTERM from main())
+    # --------------------------------------------------
+    async def run(self, stop=None):
+        stop = stop or asyncio.Event()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._isolate = asyncio.Lock()
+        workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.max_workers)
+        ]
+        try:
+            await self._watch(stop)
+            # Drain what was already accepted before shutting down
+            await self.queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._pool.shutdown()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Arena statement drop-folder service")
+    parser.add_argument("inbox")
+    parser.add_argument("workflow")
+    parser.add_argument("--outbox")
+    parser.add_argument("--quarantine")
+    parser.add_argument("--variant", default=DEFAULT_VARIANT)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--poll", type=float, default=2.0)
+    parser.add_argument("--stable-for", type=float, default=5.0)
+    parser.add_argument("--metrics")
+    parser.add_argument("--watch", choices=("poll", "inotify"), default="poll")
+    args = parser.parse_args()
+
+    async def serve():
+        daemon = IngestDaemon(
+            args.inbox, args.workflow, outbox=args.outbox, quarantine=args.quarantine,
+            variant=args.variant, max_workers=args.workers, poll_interval=args.poll,
+            stable_for=args.stable_for, metrics_path=args.metrics, watch=args.watch,
+        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await daemon.run(stop)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
+
+# python ingest_daemon.py inbox/ workflow.xlsx --workers 4 --metrics /var/lib/node_exporter/arena.prom
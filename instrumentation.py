@@ -0,0 +1,144 @@
+import json
+import os
+import time
+import tracemalloc
+
+from cache_paths import atomic_write
+
+# --------------------------------------------------
+# Per-stage profiling for the extractors. Each variant calls
+# mark("<stage>", counts...) at the end of its numbered steps;
+# with no active recorder that is one global lookup and return.
+#
+#   ARENA_PROFILE=1            record every load_extractor() call
+#   ARENA_PROFILE_MEMORY=0     skip tracemalloc (timings only)
+#   ARENA_PROFILE_JSONL=path   append one JSON record per statement
+#   ARENA_PROFILE_PROM=path    rewrite a Prometheus textfile per statement
+# --------------------------------------------------
+_current = None
+
+
+def enabled():
+    return os.environ.get("ARENA_PROFILE") == "1"
+
+
+class StageRecorder:
+    """Time (and traced peak memory) since the previous mark, per stage."""
+
+    def __init__(self, variant, file_path, trace_memory=True):
+        self.record = {
+            "variant": variant,
+            "file": os.path.basename(str(file_path)),
+            "started": time.time(),
+            "stages": [],
+        }
+        self._own_trace = trace_memory and not tracemalloc.is_tracing()
+        if self._own_trace:
+            tracemalloc.start()
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage, **counts):
+        seconds = time.perf_counter() - self._last
+
+        peak = None
+        if tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+
+        self.record["stages"].append({
+            "stage": stage,
+            "seconds": seconds,
+            "peak_bytes": peak,
+            "counts": counts,
+        })
+        # Restart the clock after our own bookkeeping
+        self._last = time.perf_counter()
+
+    def finish(self, error=None):
+        self.record["seconds"] = time.perf_counter() - self._start
+        self.record["error"] = error
+        if self._own_trace:
+            tracemalloc.stop()
+        return self.record
+
+
+def mark(stage, **counts):
+    if _current is not None:
+        _current.mark(stage, **counts)
+
+
+def write_jsonl(record, path):
+    with open(path, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_prometheus(record, path):
+    """Node-exporter textfile for the latest statement (replaced atomically)."""
+    base = f'variant="{_label(record["variant"])}",file="{_label(record["file"])}"'
+    lines = [
+        "# TYPE arena_extract_seconds gauge",
+        f"arena_extract_seconds{{{base}}} {record['seconds']:.6f}",
+        "# TYPE arena_extract_failed gauge",
+        f"arena_extract_failed{{{base}}} {int(record['error'] is not None)}",
+        "# TYPE arena_stage_seconds gauge",
+    ]
+    for s in record["stages"]:
+        lines.append(f'arena_stage_seconds{{{base},stage="{_label(s["stage"])}"}} {s["seconds"]:.6f}')
+
+    lines.append("# TYPE arena_stage_peak_bytes gauge")
+    for s in record["stages"]:
+        if s["peak_bytes"] is not None:
+            lines.append(f'arena_stage_peak_bytes{{{base},stage="{_label(s["stage"])}"}} {s["peak_bytes"]}')
+
+    lines.append("# TYPE arena_stage_count gauge")
+    for s in record["stages"]:
+        for name, value in s["counts"].items():
+            lines.append(
+                f'arena_stage_count{{{base},stage="{_label(s["stage"])}",'
+                f'count="{_label(name)}"}} {value}'
+            )
+
+    with atomic_write(path) as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def profile_call(variant, extract, file_path, *args, **kwargs):
+    """
+    Runs one extractor call under a StageRecorder. The record lands in
+    df.attrs["profile"] (DataFrame results) and in the configured outputs,
+    failed runs included.
+    """
+    global _current
+    if not enabled():
+        return extract(file_path, *args, **kwargs)
+
+    recorder = StageRecorder(
+        variant, file_path,
+        trace_memory=os.environ.get("ARENA_PROFILE_MEMORY") != "0",
+    )
+    previous, _current = _current, recorder
+
+    error = None
+    try:
+        result = extract(file_path, *args, **kwargs)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current = previous
+        record = recorder.finish(error)
+
+        jsonl = os.environ.get("ARENA_PROFILE_JSONL")
+        if jsonl:
+            write_jsonl(record, jsonl)
+        prom = os.environ.get("ARENA_PROFILE_PROM")
+        if prom:
+            write_prometheus(record, prom)
+
+    if hasattr(result, "attrs"):
+        result.attrs["profile"] = record
+    return result
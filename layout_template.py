@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import re
+
+from cache_paths import atomic_write, cache_dir
+from row_grouping import group_char_rows
+
+TEMPLATES_FILE = "templates.json"
+HEADER_ROWS = 3
+
+# Same layout month to month: rows land within this many points
+ROW_TOLERANCE = 2.0
+
+
+def layout_fingerprint(page_chars, header_rows=HEADER_ROWS):
+    """
+    Stable key for a statement layout from its first page: text extent
+    (the cache keeps no page box, and the extent tracks it), the font set
+    and the header text with digits removed so dates do not change it.
+    """
+    if not page_chars:
+        return None
+
+    rows = group_char_rows(page_chars)
+    header = [
+        "".join(c["text"] for c in rows[y])
+        for y in sorted(rows)[:header_rows]
+    ]
+    header_text = " ".join(re.sub(r"[\d\W_]+", " ", " ".join(header)).split())
+
+    key = {
+        "extent": [
+            round(max(c["x1"] for c in page_chars)),
+            round(max(c["bottom"] for c in page_chars)),
+        ],
+        "fonts": sorted({c["fontname"] for c in page_chars}),
+        "header": header_text,
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def _templates_path():
+    return os.path.join(cache_dir("layouts"), TEMPLATES_FILE)
+
+
+def _read_templates():
+    try:
+        with open(_templates_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_template(fingerprint, variant):
+    if fingerprint is None:
+        return None
+    return _read_templates().get(fingerprint, {}).get(variant)
+
+
+def save_template(fingerprint, variant, template):
+    if fingerprint is None:
+        return
+    templates = _read_templates()
+    templates.setdefault(fingerprint, {})[variant] = template
+    with atomic_write(_templates_path()) as f:
+        json.dump(templates, f, indent=1, sort_keys=True)
+
+
+def find_row_near(rows, y, tol=ROW_TOLERANCE):
+    """
+    Row whose top is closest to y, if within tol. Rows are keyed by top,
+    or by (page, top) like page_stream.stream_rows() keys them.
+    """
+    if not rows:
+        return None
+
+    def top(key):
+        return key[-1] if isinstance(key, tuple) else key
+
+    nearest = min(rows, key=lambda key: abs(top(key) - y))
+    return rows[nearest] if abs(top(nearest) - y) <= tol else None
+
+
+def row_top(row):
+    return min(c["top"] for c in row)
+
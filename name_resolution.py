@@ -1,3 +1,14 @@
+import hashlib
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
 def parse_fund_name(x):
     if pd.isna(x):
         return pd.Series([None, None, None, None, None])
@@ -30,14 +41,61 @@ def parse_fund_name(x):
 
     return pd.Series([base, entity, jurisdiction, roman, legal])
 
+PARSED_COLUMNS = ['base', 'entity', 'jurisdiction', 'roman', 'legal']
+
+# Parsed attributes per raw name, kept across calls
+_parsed_names = pd.DataFrame(columns=PARSED_COLUMNS, dtype=object)
+
+def _parse_unique_names(names):
+    x = pd.Series(names, index=names, dtype=object).str.upper().str.strip()
+
+    # Base name: everything before '(' or ','
+    base = x.str.split(r'\(|,', n=1, regex=True).str[0].str.strip()
+
+    entity = pd.Series(None, index=x.index, dtype=object)
+    entity[x.str.contains('MASTER', regex=False, na=False)] = 'MASTER'
+    entity[x.str.contains('PARTNERS', regex=False, na=False)] = 'PARTNERS'
+
+    jurisdiction = pd.Series(None, index=x.index, dtype=object)
+    jurisdiction[x.str.contains('OFFSHORE', regex=False, na=False)] = 'OFFSHORE'
+    jurisdiction[x.str.contains('CAYMAN', regex=False, na=False)] = 'CAYMAN'
+
+    roman = x.str.extract(r'\b(I{1,3}|IV|V)\b', expand=False)
+
+    legal = pd.Series(None, index=x.index, dtype=object)
+    legal[x.str.contains('LLC', regex=False, na=False)] = 'LLC'
+    legal[x.str.contains(r'\bLP\b', regex=True, na=False)] = 'LP'
+
+    parsed = pd.DataFrame({
+        'base': base,
+        'entity': entity,
+        'jurisdiction': jurisdiction,
+        'roman': roman,
+        'legal': legal,
+    }).astype(object)
+    return parsed.where(parsed.notna(), None)
+
+def parse_fund_names(names):
+    """
+    parse_fund_name for a whole column with pandas string ops. Each
+    distinct name is parsed once and remembered; output matches the
+    row-wise function (None where it returns None).
+    """
+    global _parsed_names
+
+    names = pd.Series(names, dtype=object)
+    unique = pd.unique(names.dropna())
+    new = [n for n in unique if n not in _parsed_names.index]
+    if new:
+        _parsed_names = pd.concat([_parsed_names, _parse_unique_names(new)])
+
+    parsed = _parsed_names.reindex(names.to_numpy())
+    parsed.index = names.index
+    return parsed.astype(object).where(parsed.notna(), None)
+
 proxy_df = wf[['Proxy']].drop_duplicates().copy()
 
-proxy_df[['base','entity','jurisdiction','roman','legal']] = (
-    proxy_df['Proxy'].apply(parse_fund_name)
-)
-pre_df[['base','entity','jurisdiction','roman','legal']] = (
-    pre_df['Fund Name'].apply(parse_fund_name)
-)
+proxy_df[PARSED_COLUMNS] = parse_fund_names(proxy_df['Proxy'])
 base_choices = proxy_df['base'].dropna().unique().tolist()
 
 def fuzzy_base_match(x):
@@ -51,25 +109,378 @@ def fuzzy_base_match(x):
     )
 
     return match if score >= 92 else None
-pre_df['base_match'] = pre_df['base'].apply(fuzzy_base_match)
-def resolve_proxy(row):
-    if row['base_match'] is None:
-        return None
 
-    candidates = proxy_df[
-        (proxy_df['base'] == row['base_match']) &
-        (proxy_df['entity'] == row['entity']) &
-        (proxy_df['jurisdiction'] == row['jurisdiction']) &
-        (proxy_df['roman'] == row['roman']) &
-        (proxy_df['legal'] == row['legal'])
+def fuzzy_base_match_batch(bases, choices, cutoff=92, chunk_size=2000, workers=-1):
+    """
+    Same answer as fuzzy_base_match for every base, scored as one
+    rapidfuzz cdist matrix per chunk on all cores. Each distinct base
+    is scored once. Returns a DataFrame indexed by base with
+    'base_match' (None below cutoff) and 'base_score'.
+    """
+    unique = pd.unique(pd.Series(bases, dtype=object).dropna())
+    unique = [b for b in unique if b]
+
+    result = pd.DataFrame(
+        {'base_match': [None] * len(unique), 'base_score': 0.0},
+        index=pd.Index(unique, dtype=object),
+    )
+    if not unique or not choices:
+        return result
+
+    matches = []
+    scores = []
+    for start in range(0, len(unique), chunk_size):
+        block = unique[start:start + chunk_size]
+        matrix = process.cdist(
+            block, choices,
+            scorer=fuzz.token_set_ratio,
+            score_cutoff=cutoff,
+            workers=workers,
+        )
+        # argmax keeps the first best choice, as extractOne does
+        best = matrix.argmax(axis=1)
+        best_scores = matrix[np.arange(len(block)), best]
+        matches.extend(
+            choices[j] if score >= cutoff else None
+            for j, score in zip(best.tolist(), best_scores.tolist())
+        )
+        scores.extend(best_scores.tolist())
+
+    result['base_match'] = pd.Series(matches, index=result.index, dtype=object)
+    result['base_score'] = scores
+    return result
+
+# --------------------------------------------------
+# Candidate blocking: inverted indexes over base_choices narrow each
+# query to the choices that can still reach the cutoff under
+# token_set_ratio; only those pairs are scored
+# --------------------------------------------------
+def name_tokens(text):
+    """The distinct tokens token_set_ratio compares."""
+    return sorted(set(text.split()))
+
+def token_trigrams(tokens):
+    """Trigrams of each token padded with one space, with counts."""
+    grams = Counter()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class TrigramBlocker:
+    """
+    Exact blocking for token_set_ratio >= cutoff. With x and y the joined
+    token sets of query and choice and S the joined shared tokens, the
+    score is the best of three ratios, and each has its own index:
+
+    - S against S+rest of x: needs len(S) >= k * len(x), k = c / (2 - c),
+      so the choice holds one of the query's rarest tokens
+    - S against S+rest of y: likewise one of the choice's rarest tokens
+      (indexed per choice) is in the query
+    - x against y: indel distance d <= (1 - c) * (len(x) + len(y)), so
+      len(y) is within a window of len(x) and, by the q-gram lemma, the
+      two share at least max(len) - 2 - 3d - (spaces in x) padded token
+      trigrams, counted over the postings inside that window
+
+    Candidates are a superset of every choice at or above the cutoff, so
+    their best is the exhaustive answer. A common token is only looked up
+    when the query cannot reach the cutoff without it.
+    """
+
+    def __init__(self, choices, cutoff=92):
+        self.choices = list(choices)
+        self.cutoff = cutoff
+        c = cutoff / 100
+        self.share = c / (2 - c)
+
+        tokens = [name_tokens(choice) for choice in self.choices]
+        self.frequency = Counter(t for ts in tokens for t in ts)
+        self.sizes = np.array([len(' '.join(ts)) for ts in tokens], dtype=np.int64)
+
+        holding = defaultdict(list)
+        rarest = defaultdict(list)
+        grams = defaultdict(list)
+        for i, ts in enumerate(tokens):
+            for token in ts:
+                holding[token].append(i)
+            for token in self._rarest(ts, self.share * self.sizes[i]):
+                rarest[token].append(i)
+            for gram, count in token_trigrams(ts).items():
+                grams[gram].append((i, count))
+
+        self.holding = {t: np.array(ids, dtype=np.int64) for t, ids in holding.items()}
+        self.rarest = {t: np.array(ids, dtype=np.int64) for t, ids in rarest.items()}
+
+        # Trigram postings (choice, count) are sorted by choice length,
+        # so the length window is one searchsorted slice of each
+        self.by_size = np.argsort(self.sizes, kind='stable')
+        self.grams = {}
+        for gram, pairs in grams.items():
+            ids, counts = np.array(pairs, dtype=np.int64).T
+            order = np.argsort(self.sizes[ids], kind='stable')
+            self.grams[gram] = (self.sizes[ids[order]], ids[order], counts[order])
+
+    def _rarest(self, tokens, share):
+        """Rarest tokens such that the rest joined is shorter than share."""
+        ordered = sorted(tokens, key=lambda t: (self.frequency.get(t, 0), t))
+        rest = sum(len(t) + 1 for t in ordered) - 1
+        picked = []
+        for token in ordered:
+            if rest < share - 1e-9:
+                break
+            picked.append(token)
+            rest -= len(token) + 1
+        return picked
+
+    def _window(self, size, spaces):
+        """
+        Choice lengths a query of this size and spaces can reach the
+        cutoff with, and per length the fewest padded trigrams shared.
+        """
+        c = self.cutoff / 100
+        lo = int(np.ceil(size * self.share - 1e-9))
+        hi = int(np.floor(size / self.share + 1e-9))
+        lengths = np.arange(lo, hi + 1)
+        distance = np.floor((1 - c) * (size + lengths) + 1e-9)
+        shared = np.maximum(size, lengths) - 2 - 3 * distance - spaces
+        return lo, hi, shared
+
+    def candidates(self, query):
+        """Indices, in choice order, of every choice that can score >= cutoff."""
+        tokens = name_tokens(query)
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        size = len(' '.join(tokens))
+
+        found = [self.holding[t] for t in self._rarest(tokens, self.share * size) if t in self.holding]
+        found += [self.rarest[t] for t in tokens if t in self.rarest]
+
+        lo, hi, shared = self._window(size, len(tokens) - 1)
+        if shared.min() <= 0:
+            sizes = self.sizes[self.by_size]
+            a, b = np.searchsorted(sizes, [lo, hi + 1])
+            found.append(self.by_size[a:b])
+        else:
+            ids = []
+            common = []
+            for gram, count in token_trigrams(tokens).items():
+                if gram in self.grams:
+                    sizes, gram_ids, gram_counts = self.grams[gram]
+                    a, b = np.searchsorted(sizes, [lo, hi + 1])
+                    ids.append(gram_ids[a:b])
+                    common.append(np.minimum(gram_counts[a:b], count))
+            if ids:
+                ids, at = np.unique(np.concatenate(ids), return_inverse=True)
+                common = np.bincount(at, weights=np.concatenate(common))
+                found.append(ids[common >= shared[self.sizes[ids] - lo]])
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+def fuzzy_base_match_blocked(bases, blocker, chunk_size=2000, workers=-1):
+    """
+    Same answer as fuzzy_base_match_batch, scoring each base against its
+    blocker candidates only: all (base, candidate) pairs of a chunk are
+    one rapidfuzz cpdist call on all cores.
+    """
+    unique = pd.unique(pd.Series(bases, dtype=object).dropna())
+    unique = [b for b in unique if b]
+
+    result = pd.DataFrame(
+        {'base_match': [None] * len(unique), 'base_score': 0.0},
+        index=pd.Index(unique, dtype=object),
+    )
+    if not unique or not blocker.choices:
+        return result
+
+    matches = []
+    scores = []
+    for start in range(0, len(unique), chunk_size):
+        block = unique[start:start + chunk_size]
+        found = [blocker.candidates(b) for b in block]
+        owner = np.repeat(np.arange(len(block)), [len(ids) for ids in found])
+        ids = np.concatenate(found)
+
+        best_ids = np.full(len(block), -1, dtype=np.int64)
+        best_scores = np.zeros(len(block))
+        if len(ids):
+            pair_scores = process.cpdist(
+                [block[i] for i in owner.tolist()],
+                [blocker.choices[j] for j in ids.tolist()],
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=blocker.cutoff,
+                workers=workers,
+            )
+            keep = pair_scores >= blocker.cutoff
+            owner, ids, pair_scores = owner[keep], ids[keep], pair_scores[keep]
+            # Best score first, then the lowest choice index, as argmax picks
+            order = np.lexsort((ids, -pair_scores, owner))
+            hit, first = np.unique(owner[order], return_index=True)
+            best_ids[hit] = ids[order[first]]
+            best_scores[hit] = pair_scores[order[first]]
+
+        matches.extend(blocker.choices[j] if j >= 0 else None for j in best_ids.tolist())
+        scores.extend(best_scores.tolist())
+
+    result['base_match'] = pd.Series(matches, index=result.index, dtype=object)
+    result['base_score'] = scores
+    return result
+
+def blocking_recall(queries, blocker):
+    """
+    Measured recall of the blocker against the exhaustive cdist match:
+    the share of queries with a match >= cutoff that the blocked search
+    returns unchanged. 'lost' lists the queries it got wrong.
+    """
+    exhaustive = fuzzy_base_match_batch(queries, blocker.choices, blocker.cutoff)
+    exhaustive = exhaustive[exhaustive['base_match'].notna()]
+    blocked = fuzzy_base_match_blocked(exhaustive.index, blocker)
+
+    lost = [
+        q for q in exhaustive.index
+        if blocked.at[q, 'base_match'] != exhaustive.at[q, 'base_match']
     ]
+    total = len(exhaustive)
+    return {
+        'matches': total,
+        'recall': 1.0 if total == 0 else 1 - len(lost) / total,
+        'lost': lost,
+    }
+
+PROXY_KEYS = ['base', 'entity', 'jurisdiction', 'roman', 'legal']
+
+def resolve_proxies(pre_df, proxy_df):
+    """
+    resolve_proxy for every row at once: proxy_df is indexed once by
+    (base, entity, jurisdiction, roman, legal) and pre_df joined onto it.
+    Returns (Matched_Proxy, Match_Status) aligned to pre_df, status being
+    'unique', 'ambiguous' or 'missing'. Only exactly one candidate matches.
+    """
+    # A null attribute never compared equal in the row-wise masks,
+    # so proxies with null keys can never be candidates
+    index = (
+        proxy_df.dropna(subset=PROXY_KEYS)
+        .groupby(PROXY_KEYS, sort=False)['Proxy']
+        .agg(['first', 'size'])
+    )
+
+    lookup = pre_df[['base_match'] + PROXY_KEYS[1:]].rename(columns={'base_match': 'base'})
+    joined = lookup.join(index, on=PROXY_KEYS)
+
+    size = joined['size'].fillna(0)
+    matched = joined['first'].where(size == 1, None).astype(object)
+    matched = matched.where(matched.notna(), None)
+
+    status = pd.Series(
+        np.select([size == 1, size > 1], ['unique', 'ambiguous'], default='missing'),
+        index=pre_df.index,
+    )
+    return matched, status
+
+def resolve_names(names, proxy_df, base_choices, blocker=None):
+    """Parses, fuzzy-matches and resolves fund names from scratch."""
+    work = pd.DataFrame({'Fund Name': list(names)}, dtype=object)
+    work[PARSED_COLUMNS] = parse_fund_names(work['Fund Name'])
+
+    if blocker is None:
+        matches = fuzzy_base_match_batch(work['base'], base_choices)
+    else:
+        matches = fuzzy_base_match_blocked(work['base'], blocker)
+    known = [isinstance(b, str) and b in matches.index for b in work['base']]
+    work['base_match'] = [
+        matches.at[b, 'base_match'] if k else None for b, k in zip(work['base'], known)
+    ]
+    work['score'] = [
+        matches.at[b, 'base_score'] if k else 0.0 for b, k in zip(work['base'], known)
+    ]
+
+    work['Matched_Proxy'], work['Match_Status'] = resolve_proxies(work, proxy_df)
+    return work
+
+# --------------------------------------------------
+# Persistent Fund Name -> Proxy store (SQLite)
+# --------------------------------------------------
+RESOLUTION_DB = 'name_resolution.sqlite'
+
+STORE_COLUMNS = (
+    ['Fund Name'] + PARSED_COLUMNS
+    + ['base_match', 'score', 'Matched_Proxy', 'Match_Status']
+)
+
+def proxy_universe_version(proxy_df):
+    """Changes whenever the set of proxies changes."""
+    proxies = sorted(proxy_df['Proxy'].dropna().astype(str).unique())
+    return hashlib.sha256('\n'.join(proxies).encode()).hexdigest()
+
+def _open_store(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resolutions (
+            fund_name TEXT PRIMARY KEY,
+            base TEXT, entity TEXT, jurisdiction TEXT, roman TEXT, legal TEXT,
+            base_match TEXT, score REAL, matched_proxy TEXT, status TEXT,
+            universe_version TEXT, resolved_at TEXT
+        )
+    """)
+    return conn
+
+def _read_store(conn, version):
+    stored = pd.read_sql_query(
+        """
+        SELECT fund_name, base, entity, jurisdiction, roman, legal,
+               base_match, score, matched_proxy, status
+        FROM resolutions WHERE universe_version = ?
+        """,
+        conn, params=(version,),
+    )
+    stored.columns = STORE_COLUMNS
+    stored = stored.astype(object)
+    return stored.where(stored.notna(), None)
+
+def resolve_with_store(pre_df, proxy_df, base_choices, db_path=RESOLUTION_DB, blocker=None):
+    """
+    Adds the parsed attributes, base_match, score, Matched_Proxy and
+    Match_Status to pre_df. Only names the store has not resolved against
+    the current proxy universe are parsed and matched; the rest are read back.
+    """
+    version = proxy_universe_version(proxy_df)
+
+    with closing(_open_store(db_path)) as conn, conn:
+        stored = _read_store(conn, version)
+        seen = set(stored['Fund Name'])
+        todo = [n for n in pd.unique(pre_df['Fund Name'].dropna()) if n not in seen]
+
+        if todo:
+            fresh = resolve_names(todo, proxy_df, base_choices, blocker=blocker)
+            now = datetime.now().isoformat(timespec='seconds')
+            conn.executemany(
+                "INSERT OR REPLACE INTO resolutions VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                [
+                    tuple(row) + (version, now)
+                    for row in fresh[STORE_COLUMNS].itertuples(index=False)
+                ],
+            )
+            stored = _read_store(conn, version)
+
+    resolved = pre_df.drop(columns=STORE_COLUMNS[1:], errors='ignore').merge(
+        stored, on='Fund Name', how='left'
+    )
+    resolved.index = pre_df.index
+    return resolved
 
-    if len(candidates) == 1:
-        return candidates.iloc[0]['Proxy']
+def load_audit(fund_names, proxy_df, db_path=RESOLUTION_DB):
+    """Unmatched or ambiguous names among fund_names, read from the store."""
+    with closing(_open_store(db_path)) as conn:
+        stored = _read_store(conn, proxy_universe_version(proxy_df))
+    stored = stored[stored['Fund Name'].isin(set(fund_names.dropna()))]
+    return stored[stored['Matched_Proxy'].isna()][
+        ['Fund Name', 'base', 'entity', 'jurisdiction', 'roman', 'legal', 'Match_Status']
+    ].reset_index(drop=True)
 
-    return None  # ambiguous or no match
-pre_df['Matched_Proxy'] = pre_df.apply(resolve_proxy, axis=1)
+# Blocked matching returns the exhaustive answer for the unseen names;
+# blocking_recall(names, base_blocker) re-checks that against full cdist
+base_blocker = TrigramBlocker(base_choices)
+pre_df = resolve_with_store(pre_df, proxy_df, base_choices, blocker=base_blocker)
 # Unmatched or ambiguous rows
-audit_df = pre_df[pre_df['Matched_Proxy'].isna()][
-    ['Fund Name','base','entity','jurisdiction','roman','legal']
-]
+audit_df = load_audit(pre_df['Fund Name'], proxy_df)
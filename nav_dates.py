@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = ("M", "Q")
+
+
+class BusinessCalendar:
+    """
+    Precomputed lookup: for every day in [start, end], the last business
+    day on or before it (weekends and the given holidays skipped).
+    """
+
+    def __init__(self, start, end, holidays=()):
+        self.start = np.datetime64(pd.Timestamp(start).date(), "D")
+        self.end = np.datetime64(pd.Timestamp(end).date(), "D")
+        self.holidays = np.array(
+            [np.datetime64(pd.Timestamp(h).date(), "D") for h in holidays],
+            dtype="datetime64[D]",
+        )
+
+        days = np.arange(self.start, self.end + 1, dtype="datetime64[D]")
+        is_business = np.is_busday(days, holidays=self.holidays)
+        last = np.maximum.accumulate(np.where(is_business, np.arange(len(days)), -1))
+
+        self.table = np.where(last >= 0, days[np.maximum(last, 0)], np.datetime64("NaT"))
+
+    def roll_back(self, days):
+        """Last business day on or before each datetime64[D] value."""
+        days = np.asarray(days, dtype="datetime64[D]")
+        out = np.full(days.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+
+        valid = ~np.isnat(days)
+        offset = (days - self.start).astype(np.int64)
+        inside = valid & (offset >= 0) & (days <= self.end)
+        out[inside] = self.table[offset[inside]]
+
+        # Dates outside the table fall back to NumPy's busday roll
+        outside = valid & ~inside
+        if outside.any():
+            out[outside] = np.busday_offset(
+                days[outside], 0, roll="backward", holidays=self.holidays
+            )
+        return out
+
+
+def nav_date(dates, freq="M", calendar=None):
+    """
+    NAV date for each previous NAV date: the end of the following month
+    (freq="M") or quarter (freq="Q"), optionally rolled back to the last
+    business day of a BusinessCalendar. Works on the whole column at once.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"NAV frequency must be one of {FREQUENCIES}, got {freq!r}")
+
+    series = dates if isinstance(dates, pd.Series) else pd.Series(dates)
+    days = pd.to_datetime(series).to_numpy(dtype="datetime64[D]")
+    months = days.astype("datetime64[M]")
+
+    if freq == "M":
+        length = 1
+        next_start = months + 1
+    else:
+        # First month of the current quarter, then one quarter on
+        length = 3
+        month_of_year = months.astype(np.int64) % 12
+        next_start = months - (month_of_year % 3) + 3
+
+    period_end = (next_start + length).astype("datetime64[D]") - 1
+
+    if calendar is not None:
+        period_end = calendar.roll_back(period_end)
+
+    return pd.Series(period_end.astype("datetime64[ns]"), index=series.index, name=series.name)
@@ -0,0 +1,221 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from cache_paths import atomic_write, cache_dir
+
+HISTORY_COLUMNS = ["Fund UCN", "NAV Date", "NAV", "MTD", "Extracted At"]
+SOURCE_COLUMNS = ["Fund UCN", "NAV Date", "NAV", "MTD"]
+LOOKBACKS = ("1M", "3M", "QTD", "YTD")
+
+# A month partition is rewritten as one file once it holds this many parts
+COMPACT_PARTS = 8
+
+
+def history_dir():
+    """Root of the month-partitioned NAV dataset (ARENA_NAV_HISTORY overrides)."""
+    root = os.environ.get("ARENA_NAV_HISTORY")
+    if root:
+        os.makedirs(root, exist_ok=True)
+        return root
+    return cache_dir("nav_history")
+
+
+def _months(nav_dates):
+    days = pd.to_datetime(pd.Series(nav_dates)).to_numpy(dtype="datetime64[D]")
+    return days.astype("datetime64[M]")
+
+
+def _month_keys(months):
+    return np.datetime_as_string(months, unit="M")
+
+
+def lookback_months(nav_dates, lookback):
+    """
+    Month ("YYYY-MM") holding the comparison NAV for each NAV date:
+    1M / 3M months back, QTD the previous quarter end, YTD the previous
+    year end.
+    """
+    months = _months(nav_dates)
+    month_of_year = months.astype(np.int64) % 12
+
+    if lookback == "1M":
+        target = months - 1
+    elif lookback == "3M":
+        target = months - 3
+    elif lookback == "QTD":
+        target = months - (month_of_year % 3) - 1
+    elif lookback == "YTD":
+        target = months - month_of_year - 1
+    else:
+        raise ValueError(f"Lookback must be one of {LOOKBACKS}, got {lookback!r}")
+
+    return _month_keys(target)
+
+
+def _partition(root, month):
+    return os.path.join(root, f"month={month}")
+
+
+def _parts(folder):
+    # Dot-prefixed names are writes still in progress
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        os.path.join(folder, name) for name in names
+        if name.endswith(".parquet") and not name.startswith((".", "_"))
+    )
+
+
+def _read_part(path, **kwargs):
+    # None when another writer compacted the part away after listing;
+    # its rows are in that writer's new part
+    try:
+        return pd.read_parquet(path, **kwargs)
+    except FileNotFoundError:
+        return None
+
+
+def _write_part(folder, df):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"part-{uuid.uuid4().hex}.parquet")
+    with atomic_write(path, "wb") as f:
+        df.to_parquet(f, index=False)
+    return path
+
+
+def compact_month(month, root=None):
+    """
+    Rewrites one month partition as a single file sorted by Fund UCN,
+    keeping only the newest extraction per (Fund UCN, NAV Date).
+    """
+    root = root or history_dir()
+    folder = _partition(root, month)
+    parts = _parts(folder)
+    if len(parts) < 2:
+        return len(parts)
+
+    frames = [_read_part(p, columns=HISTORY_COLUMNS) for p in parts]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return 0
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values(["Fund UCN", "NAV Date", "Extracted At"], kind="stable")
+    df = df.drop_duplicates(["Fund UCN", "NAV Date"], keep="last")
+
+    # New file first: a reader in between sees duplicates, which
+    # read_history drops, never a missing month
+    _write_part(folder, df)
+    for p in parts:
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+    return 1
+
+
+def append_history(df, root=None):
+    """
+    Appends extracted (Fund UCN, NAV Date, NAV, MTD) rows as a new part
+    file under month=YYYY-MM, compacting that month once it holds
+    COMPACT_PARTS files. Frames without those columns (variants that
+    compute no NAV Date) are skipped. Called by the batch / ingest
+    drivers, not by the extractors, so trial runs are never stored.
+    """
+    if not set(SOURCE_COLUMNS) <= set(df.columns):
+        return 0
+    root = root or history_dir()
+
+    out = pd.DataFrame({
+        "Fund UCN": df["Fund UCN"].astype(str).to_numpy(),
+        "NAV Date": pd.to_datetime(df["NAV Date"]).to_numpy(),
+        "NAV": df["NAV"].astype(float).to_numpy(),
+        "MTD": df["MTD"].astype(float).to_numpy(),
+    })
+    out["Extracted At"] = pd.Timestamp.now()
+    out = out.dropna(subset=["NAV Date"])
+    if out.empty:
+        return 0
+
+    months = _month_keys(out["NAV Date"].to_numpy().astype("datetime64[M]"))
+    for month, rows in out.groupby(months, sort=True):
+        folder = _partition(root, month)
+        _write_part(folder, rows.reset_index(drop=True))
+        if len(_parts(folder)) >= COMPACT_PARTS:
+            compact_month(month, root)
+    return len(out)
+
+
+def read_history(ucns, months, root=None):
+    """
+    Latest NAV per (Fund UCN, month) for just the requested funds and
+    months. Only the month=YYYY-MM folders asked for are listed and
+    read (each compacted to a few files), with a Fund UCN row filter,
+    so the cost follows the request, not the size of the history.
+    """
+    root = root or history_dir()
+    ucns = sorted(set(pd.Series(ucns).astype(str)))
+    months = sorted(set(months))
+
+    frames = []
+    if ucns:
+        for month in months:
+            for part in _parts(_partition(root, month)):
+                df = _read_part(
+                    part, columns=HISTORY_COLUMNS, filters=[("Fund UCN", "in", ucns)]
+                )
+                if df is not None:
+                    frames.append(df.assign(month=month))
+
+    if not frames:
+        return pd.DataFrame(columns=HISTORY_COLUMNS + ["month"])
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # Re-extractions of the same statement: the newest one wins
+    df = df.sort_values(["NAV Date", "Extracted At"], kind="stable")
+    return df.drop_duplicates(["Fund UCN", "month"], keep="last").reset_index(drop=True)
+
+
+def add_lookbacks(df, lookbacks=LOOKBACKS, root=None):
+    """
+    Adds 'Prev NAV <lb>' and 'Variance <lb>' for each lookback, with one
+    history read and one keyed join per lookback.
+    """
+    df = df.copy()
+    ucns = df["Fund UCN"].astype(str).to_numpy()
+    targets = {lb: lookback_months(df["NAV Date"], lb) for lb in lookbacks}
+
+    history = read_history(
+        ucns, np.concatenate(list(targets.values())) if targets else [], root=root
+    )
+    navs = history.set_index(["Fund UCN", "month"])["NAV"].astype(float)
+
+    for lb, months in targets.items():
+        keys = pd.DataFrame({"Fund UCN": ucns, "month": months})
+        prev = keys.join(navs, on=["Fund UCN", "month"])["NAV"].to_numpy()
+
+        df[f"Prev NAV {lb}"] = prev
+        df[f"Variance {lb}"] = abs((df["NAV"] - prev) / prev * 100)
+
+    return df
+
+
+def prev_nav(ucns, nav_dates, lookback="1M", root=None):
+    """Stored NAV one lookback before each NAV date (NaN when not in history)."""
+    ucns = pd.Series(ucns)
+    df = pd.DataFrame({
+        "Fund UCN": ucns.to_numpy(),
+        "NAV Date": pd.Series(nav_dates).to_numpy(),
+        "NAV": np.nan,
+    })
+    prev = add_lookbacks(df, (lookback,), root=root)[f"Prev NAV {lookback}"]
+    return pd.Series(prev.to_numpy(), index=ucns.index, name="Prev NAV")
+
+
+# df = add_lookbacks(extract_batch("statements/2025-09/", "workflow.xlsx"))
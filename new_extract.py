@@ -1,47 +1,33 @@
 def extract_arena(file_path, workflow_path):
-    import pdfplumber
-    import pandas as pd
-    import re
+    from char_cache import load_chars
+    from nav_dates import nav_date
+    from nav_history import prev_nav
+    from instrumentation import mark
+    from row_grouping import group_char_rows
+    from tokenizer import tokenize_row
+    from workflow_cache import load_workflow
 
     # --------------------------------------------------
     # Helper: split a row into columns using X gaps
+    # (typed tokens; spaces stay inside a column)
     # --------------------------------------------------
     def extract_columns_from_row(row_chars, gap=25):
-        row_chars = sorted(row_chars, key=lambda x: x["x0"])
-        columns = []
-        current = [row_chars[0]]
-
-        for c in row_chars[1:]:
-            if c["x0"] - current[-1]["x1"] <= gap:
-                current.append(c)
-            else:
-                columns.append(current)
-                current = [c]
-
-        columns.append(current)
-
-        return [
-            "".join(ch["text"] for ch in col).strip()
-            for col in columns
-        ]
+        return tokenize_row(row_chars, text_gap=gap, numeric_gap=gap, split_on_space=False)
 
     # --------------------------------------------------
     # 1. Read characters (first page only)
     # --------------------------------------------------
-    with pdfplumber.open(file_path) as pdf:
-        page = pdf.pages[0]
-        chars = page.chars
+    chars = load_chars(file_path, first_page_only=True)
 
     if not chars:
         raise ValueError("Arena PDF: no characters extracted")
+    mark("parse", chars=len(chars))
 
     # --------------------------------------------------
     # 2. Group characters by Y position (rows)
     # --------------------------------------------------
-    rows = {}
-    for c in chars:
-        y = round(c["top"], 1)
-        rows.setdefault(y, []).append(c)
+    rows = group_char_rows(chars)
+    mark("grouping", rows=len(rows))
 
     # --------------------------------------------------
     # 3. Identify NAV and MTD rows by numeric density
@@ -54,8 +40,8 @@ def extract_arena(file_path, workflow_path):
     for y, rchars in rows.items():
         cols = extract_columns_from_row(rchars)
 
-        nav_count = sum(1 for c in cols if "," in c and re.search(r"\d", c))
-        mtd_count = sum(1 for c in cols if "%" in c)
+        nav_count = sum(1 for c in cols if c["kind"] == "nav")
+        mtd_count = sum(1 for c in cols if c["kind"] == "mtd")
 
         if nav_count > max_nav_count:
             max_nav_count = nav_count
@@ -67,40 +53,37 @@ def extract_arena(file_path, workflow_path):
 
     if nav_row_y is None or mtd_row_y is None:
         raise ValueError("Arena PDF: failed to locate NAV or MTD rows")
+    mark("row_detection", rows=len(rows))
 
     # --------------------------------------------------
     # 4. Extract NAV values (COLUMN-AWARE)
     # --------------------------------------------------
     nav_cols = extract_columns_from_row(rows[nav_row_y])
 
-    nav_values = []
-    for col in nav_cols:
-        cleaned = col.replace(" ", "")
-        if re.search(r"\d,\d{3}", cleaned):
-            nav_values.append(float(cleaned.replace(",", "")))
+    nav_values = [col["value"] for col in nav_cols if col["kind"] == "nav"]
 
     # --------------------------------------------------
     # 5. Extract MTD values (COLUMN-AWARE)
     # --------------------------------------------------
     mtd_cols = extract_columns_from_row(rows[mtd_row_y])
 
-    mtd_values = []
-    for col in mtd_cols:
-        if "%" in col:
-            mtd_values.append(float(col.replace("%", "").replace(" ", "")))
+    mtd_values = [col["value"] for col in mtd_cols if col["kind"] == "mtd"]
 
     if not nav_values or not mtd_values:
         raise ValueError("Arena PDF: NAV or MTD values empty after extraction")
+    mark("tokenize", nav=len(nav_values), mtd=len(mtd_values))
 
     # --------------------------------------------------
     # 6. Load workflow (SOURCE OF TRUTH)
     # --------------------------------------------------
-    wf = pd.read_excel(workflow_path)
-    wf = wf[['Fund UCN', 'Fund Name', 'DATE', 'NAV (thous)']]
+    wf = load_workflow(
+        workflow_path, columns=['Fund UCN', 'Fund Name', 'DATE', 'NAV (thous)']
+    )
     wf.rename(columns={'NAV (thous)': 'Prev NAV'}, inplace=True)
+    mark("workflow", funds=len(wf))
 
-    wf['NAV Date'] = nav_date(wf['DATE'].tolist())
-    wf['NAV Date'] = wf['NAV Date'].dt.strftime("%m/%d/%Y")
+    nav_dates = nav_date(wf['DATE'])
+    wf['NAV Date'] = nav_dates.dt.strftime("%m/%d/%Y")
 
     # --------------------------------------------------
     # 7. Hard safety checks
@@ -123,7 +106,11 @@ def extract_arena(file_path, workflow_path):
     wf['NAV'] = nav_values
     wf['MTD'] = mtd_values
 
-    wf['Prev NAV'] = wf['Prev NAV'].astype(float)
+    # Prev NAV from the NAV history (previous month end);
+    # the workbook value only covers funds not stored yet
+    wf['Prev NAV'] = prev_nav(wf['Fund UCN'], nav_dates).fillna(
+        wf['Prev NAV'].astype(float)
+    )
     wf['Variance'] = abs(
         (wf['NAV'] - wf['Prev NAV']) / wf['Prev NAV'] * 100
     )
@@ -131,5 +118,6 @@ def extract_arena(file_path, workflow_path):
     wf = wf[
         ['Fund UCN', 'Fund Name', 'NAV Date', 'NAV', 'MTD', 'Prev NAV', 'Variance']
     ].sort_values(by='Variance')
+    mark("variance", funds=len(wf))
 
     return wf
@@ -1,82 +1,145 @@
-import pdfplumber
-import pandas as pd
+import numpy as np
 import re
-from collections import defaultdict
+
+from column_assign import cluster_columns, nearest_columns
+from instrumentation import mark
+from layout_template import (
+    find_row_near, layout_fingerprint, load_template, row_top, save_template,
+)
+from page_stream import stream_rows
+from workflow_cache import load_workflow
 
 def extract_arena(file_path, workflow_path):
 
     # 1. Read workflow
-    wf = pd.read_excel(workflow_path)
+    wf = load_workflow(workflow_path, columns=["Fund UCN", "Fund Name"])
     wf = wf[wf["Fund Name"].str.contains("Arena", case=False, na=False)]
     wf = wf.reset_index(drop=True)
 
     if wf.empty:
         raise ValueError("Arena: No Arena funds in workflow")
+    mark("workflow", funds=len(wf))
+
+    # 2. Row finder: NAV row and MTD row by content, plus the rows at
+    #    the saved tops of a known layout (first page with a match wins);
+    #    each page's rows are looked at once, as the page arrives
+    found = {}
+
+    def find_rows():
+        return found.get("nav"), found.get("mtd")
+
+    # Known layout: rows at the saved tops
+    def template_rows():
+        if template is None:
+            return None, None
+        return found.get("template_nav"), found.get("template_mtd")
+
+    def add_page(page_rows):
+        for row in page_rows.values():
+            text = "".join(c["text"] for c in row)
+
+            if "nav" not in found and len(re.findall(r"\d{1,3},\d{3}", text)) >= 5 and "%" not in text:
+                found["nav"] = row
+
+            if "mtd" not in found and "%" in text:
+                found["mtd"] = row
 
-    # 2. Read all chars
-    chars = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            chars.extend(page.chars)
+        if template is not None:
+            for name in ("nav", "mtd"):
+                if f"template_{name}" not in found:
+                    row = find_row_near(page_rows, template[f"{name}_top"])
+                    if row is not None:
+                        found[f"template_{name}"] = row
+
+        return None not in template_rows() or None not in find_rows()
+
+    # 3. Stream pages and group chars by Y (rows) until both rows are found
+    fingerprint = None
+    template = None
+
+    def on_page(page_number, page_chars):
+        nonlocal fingerprint, template
+        if page_number == 0 and fingerprint is None:
+            fingerprint = layout_fingerprint(page_chars)
+            template = load_template(fingerprint, "new_extract_arena")
+
+    def stream():
+        found.clear()
+        return stream_rows(file_path, add_page, on_page=on_page)
+
+    chars, rows, pages_parsed = stream()
 
     if not chars:
         raise ValueError("Arena PDF: No text extracted")
-
-    # 3. Group chars by Y (rows)
-    rows = defaultdict(list)
-    for c in chars:
-        rows[round(c["top"], 1)].append(c)
-
-    # 4. Identify NAV row and MTD row by content
-    nav_row = None
-    mtd_row = None
-
-    for row in rows.values():
-        text = "".join(c["text"] for c in row)
-
-        if nav_row is None and len(re.findall(r"\d{1,3},\d{3}", text)) >= 5 and "%" not in text:
-            nav_row = row
-
-        if mtd_row is None and "%" in text:
-            mtd_row = row
-
-    if nav_row is None or mtd_row is None:
-        raise ValueError("Arena PDF: NAV or MTD row not found")
-
-    # 5. Cluster characters into columns using X-center
-    def cluster_columns(row, tol=8):
-        cols = []
-        for c in sorted(row, key=lambda x: (x["x0"] + x["x1"]) / 2):
-            cx = (c["x0"] + c["x1"]) / 2
-            placed = False
-            for col in cols:
-                col_cx = col["cx"]
-                if abs(cx - col_cx) <= tol:
-                    col["chars"].append(c)
-                    placed = True
-                    break
-            if not placed:
-                cols.append({"cx": cx, "chars": [c]})
+    mark("parse", chars=len(chars), rows=len(rows), pages=pages_parsed)
+
+    # 4. Known layout: drop chars into the saved columns instead of clustering
+    def template_columns(row, centers, tol=8):
+        cxs = [(c["x0"] + c["x1"]) / 2 for c in row]
+        idx = nearest_columns(centers, cxs)
+        if (abs(np.asarray(cxs) - np.asarray(centers)[idx]) > tol).any():
+            return None
+
+        cols = [{"cx": cx, "chars": []} for cx in centers]
+        for i in np.argsort(cxs, kind="stable"):
+            cols[idx[i]]["chars"].append(row[i])
         return cols
 
-    nav_cols = cluster_columns(nav_row)
-    mtd_cols = cluster_columns(mtd_row)
-
-    # 6. Extract NAV values (skip date column)
-    nav_values = []
-    for col in nav_cols:
-        text = "".join(c["text"] for c in col["chars"]).replace(" ", "")
-        if "/" in text:
-            continue
-        if re.fullmatch(r"\d{1,3}(?:,\d{3})+", text):
-            nav_values.append(float(text.replace(",", "")))
-
-    # 7. Extract MTD values
-    mtd_values = []
-    for col in mtd_cols:
-        text = "".join(c["text"] for c in col["chars"])
-        if "%" in text:
-            mtd_values.append(float(text.replace("%", "").strip()))
+    # 5. Extract NAV values (skip date column) and MTD values
+    def nav_from(cols):
+        nav_values = []
+        for col in cols:
+            text = "".join(c["text"] for c in col["chars"]).replace(" ", "")
+            if "/" in text:
+                continue
+            if re.fullmatch(r"\d{1,3}(?:,\d{3})+", text):
+                nav_values.append(float(text.replace(",", "")))
+        return nav_values
+
+    def mtd_from(cols):
+        mtd_values = []
+        for col in cols:
+            text = "".join(c["text"] for c in col["chars"])
+            if "%" in text:
+                mtd_values.append(float(text.replace("%", "").strip()))
+        return mtd_values
+
+    # 6. Apply the saved layout; it must reproduce one value per fund
+    nav_values = None
+    mtd_values = None
+
+    nav_row, mtd_row = template_rows()
+    if nav_row is not None and mtd_row is not None:
+        nav_cols = template_columns(nav_row, template["nav_centers"])
+        mtd_cols = template_columns(mtd_row, template["mtd_centers"])
+        if nav_cols is not None and mtd_cols is not None:
+            nav_values = nav_from(nav_cols)
+            mtd_values = mtd_from(mtd_cols)
+            if not (len(nav_values) == len(mtd_values) == len(wf)):
+                nav_values = None
+                mtd_values = None
+
+        if nav_values is None:
+            # Rows matched the template but their columns did not: stream
+            # again without it (cached pages first) before discovery
+            template = None
+            chars, rows, pages_parsed = stream()
+
+    # 7. Discovery: identify NAV / MTD rows and cluster their columns
+    discovered = nav_values is None
+    if discovered:
+        nav_row, mtd_row = find_rows()
+
+        if nav_row is None or mtd_row is None:
+            raise ValueError("Arena PDF: NAV or MTD row not found")
+
+        nav_cols = cluster_columns(nav_row)
+        mtd_cols = cluster_columns(mtd_row)
+
+        nav_values = nav_from(nav_cols)
+        mtd_values = mtd_from(mtd_cols)
+
+    mark("columns", template=not discovered, nav=len(nav_values), mtd=len(mtd_values))
 
     # 8. Hard validation
     if not nav_values or not mtd_values:
@@ -90,9 +153,19 @@ def extract_arena(file_path, workflow_path):
             f"Arena vs Workflow mismatch: Arena={len(nav_values)}, Workflow={len(wf)}"
         )
 
+    if discovered:
+        save_template(fingerprint, "new_extract_arena", {
+            "nav_top": row_top(nav_row),
+            "mtd_top": row_top(mtd_row),
+            "nav_centers": [col["cx"] for col in nav_cols],
+            "mtd_centers": [col["cx"] for col in mtd_cols],
+        })
+
     # 9. Output
     wf["NAV"] = nav_values
     wf["MTD"] = mtd_values
     wf["Variance"] = abs(wf["MTD"])
+    wf.attrs["pages_parsed"] = pages_parsed
+    mark("output", funds=len(wf))
 
     return wf
@@ -1,158 +1,195 @@
-import pdfplumber
-import pandas as pd
-from collections import defaultdict
+from column_assign import nearest_columns
+from instrumentation import mark
+from layout_template import (
+    find_row_near, layout_fingerprint, load_template, row_top, save_template,
+)
+from page_stream import stream_rows
+from row_features import classify_rows, first_row
+from tokenizer import tokenize_row
+from workflow_cache import load_workflow
 
 def extract_arena(file_path, workflow_path):
 
     # --------------------------------------------------
     # 1. Read workflow (Arena funds only)
     # --------------------------------------------------
-    wf = pd.read_excel(workflow_path)
+    wf = load_workflow(workflow_path, columns=["Fund UCN", "Fund Name"])
     wf = wf[wf["Fund Name"].str.contains("Arena", case=False, na=False)]
     wf = wf.reset_index(drop=True)
     fund_count = len(wf)
 
     if fund_count == 0:
         raise ValueError("Arena: No Arena funds found in workflow")
+    mark("workflow", funds=len(wf))
 
     # --------------------------------------------------
-    # 2. Read all PDF characters
+    # 2. Row finder: one classification pass answers the
+    #    fund name, NAV and MTD row questions together
+    #    (each page is classified once, as it arrives)
     # --------------------------------------------------
-    chars = []
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            chars.extend(page.chars)
+    features = []
 
-    if not chars:
-        raise ValueError("Arena PDF: No text extracted")
+    def find_rows():
+        fund = first_row(features, lambda f: f["arena_count"] >= fund_count)
+        nav = first_row(features, lambda f: f["has_comma"] and not f["has_percent"])
+        mtd = first_row(features, lambda f: f["has_percent"])
+        return tuple(None if f is None else f["row"] for f in (fund, nav, mtd))
 
-    # --------------------------------------------------
-    # 3. Group characters into rows (by Y position)
-    # --------------------------------------------------
-    rows = defaultdict(list)
-    for c in chars:
-        rows[round(c["top"], 1)].append(c)
+    # Known layout: NAV / MTD rows sit at fixed offsets from the fund
+    # row; the first page with a row at each offset supplies it
+    template_hits = {}
 
-    # --------------------------------------------------
-    # 4. Helper: merge chars into tokens (digits, commas, %)
-    # --------------------------------------------------
-    def build_tokens(row):
-        row = sorted(row, key=lambda x: x["x0"])
-        tokens = []
-        current = [row[0]]
-
-        for c in row[1:]:
-            prev = current[-1]
-            if (
-                (prev["text"].isdigit() or prev["text"] in ",%")
-                and (c["text"].isdigit() or c["text"] in ",%")
-            ):
-                current.append(c)
-            else:
-                tokens.append(current)
-                current = [c]
-
-        tokens.append(current)
-        return tokens
+    def template_rows():
+        if "nav" not in template_hits or "mtd" not in template_hits:
+            return None
+        return template_hits["nav"], template_hits["mtd"]
+
+    def add_page(page_rows):
+        features.extend(classify_rows(page_rows))
+        if template is not None:
+            for name in ("nav", "mtd"):
+                if name not in template_hits:
+                    row = find_row_near(
+                        page_rows, template["fund_top"] + template[f"{name}_offset"]
+                    )
+                    if row is not None:
+                        template_hits[name] = row
+        return template_rows() is not None or None not in find_rows()
 
     # --------------------------------------------------
-    # 5. Find FUND NAME row (anchor columns)
+    # 3. Stream pages, grouping rows as we go; stop once
+    #    the fund, NAV and MTD rows have all shown up
     # --------------------------------------------------
-    fund_row = None
-    for row in rows.values():
-        text = " ".join(c["text"] for c in row)
-        if text.count("Arena") >= fund_count:
-            fund_row = row
-            break
+    fingerprint = None
+    template = None
 
-    if fund_row is None:
-        raise ValueError("Arena PDF: Fund name row not found")
+    def on_page(page_number, page_chars):
+        nonlocal fingerprint, template
+        if page_number == 0 and fingerprint is None:
+            fingerprint = layout_fingerprint(page_chars)
+            template = load_template(fingerprint, "newest_extract")
+            if template is not None and len(template["fund_centers"]) != fund_count:
+                template = None
 
-    # Column centers from fund names
-    fund_tokens = build_tokens(fund_row)
-    fund_centers = []
+    def stream():
+        features.clear()
+        template_hits.clear()
+        return stream_rows(file_path, add_page, on_page=on_page)
 
-    for tok in fund_tokens:
-        xs = [(c["x0"] + c["x1"]) / 2 for c in tok]
-        fund_centers.append(sum(xs) / len(xs))
+    chars, rows, pages_parsed = stream()
 
-    fund_centers = fund_centers[:fund_count]
+    if not chars:
+        raise ValueError("Arena PDF: No text extracted")
+    mark("parse", chars=len(chars), rows=len(rows), pages=pages_parsed)
 
     # --------------------------------------------------
-    # 6. Find NAV row
+    # 4. Helper: assign tokens to nearest fund column
     # --------------------------------------------------
-    nav_row = None
-    for row in rows.values():
-        text = "".join(c["text"] for c in row)
-        if "," in text and "%" not in text:
-            nav_row = row
-            break
+    def assign_to_columns(tokens, centers, is_nav=True, bare_numbers=False):
+        values = [None] * len(centers)
 
-    if nav_row is None:
-        raise ValueError("Arena PDF: NAV row not found")
+        # NAV must be large numbers (exclude 10, 1, 2025, etc.);
+        # dates and junk are already typed apart by the tokenizer.
+        # MTD takes percentages; bare numbers only on a row below NAV.
+        if is_nav:
+            picked = [t for t in tokens if t["kind"] == "nav" and t["value"] >= 100000]
+        else:
+            kinds = ("mtd", "number") if bare_numbers else ("mtd",)
+            picked = [t for t in tokens if t["kind"] in kinds]
+
+        parsed = [t["value"] for t in picked]
+        cxs = [t["cx"] for t in picked]
+
+        # One batched nearest-center lookup for the whole row
+        if parsed:
+            for idx, val in zip(nearest_columns(centers, cxs).tolist(), parsed):
+                values[idx] = val
+
+        return values
 
     # --------------------------------------------------
-    # 7. Find MTD row
+    # 5. Known layout: apply the saved template, keep it
+    #    only if every column gets a value
     # --------------------------------------------------
-    mtd_row = None
-    for row in rows.values():
-        text = "".join(c["text"] for c in row)
-        if "%" in text:
-            mtd_row = row
-            break
+    nav_values = None
+    mtd_values = None
+
+    found = template_rows()
+    if found is not None:
+        nav_row, mtd_row = found
+        nav_values = assign_to_columns(tokenize_row(nav_row), template["fund_centers"], is_nav=True)
+        mtd_values = assign_to_columns(
+            tokenize_row(mtd_row), template["fund_centers"], is_nav=False,
+            bare_numbers=row_top(mtd_row) > row_top(nav_row),
+        )
 
-    if mtd_row is None:
-        raise ValueError("Arena PDF: MTD row not found")
+        if None in nav_values or None in mtd_values:
+            # The saved rows showed up but their values do not fit: stream
+            # again without the template (cached pages first), so discovery
+            # sees as many pages as it needs, not just those read so far
+            nav_values = None
+            mtd_values = None
+            template = None
+            chars, rows, pages_parsed = stream()
 
     # --------------------------------------------------
-    # 8. Assign tokens to nearest fund column
+    # 6. Discovery: find FUND NAME row (anchor columns),
+    #    NAV row and MTD row
     # --------------------------------------------------
-    def assign_to_columns(tokens, centers, is_nav=True):
-        values = [None] * len(centers)
+    if nav_values is None:
+        fund_row, nav_row, mtd_row = find_rows()
 
-        for tok in tokens:
-            raw = "".join(c["text"] for c in tok).strip()
-            cleaned = raw.replace(",", "").replace("%", "")
+        if fund_row is None:
+            raise ValueError("Arena PDF: Fund name row not found")
 
-            # Skip dates and junk
-            if "/" in cleaned or not cleaned:
-                continue
+        # Column centers from fund names (one token per name)
+        fund_tokens = tokenize_row(fund_row, text_gap=10, split_on_space=False)
+        fund_centers = [t["cx"] for t in fund_tokens if "Arena" in t["text"]]
+        fund_centers = fund_centers[:fund_count]
 
-            # NAV must be large numbers (exclude 10, 1, 2025, etc.)
-            if is_nav and (not cleaned.isdigit() or len(cleaned) < 6):
-                continue
+        if len(fund_centers) < fund_count:
+            raise ValueError(
+                f"Arena PDF: {len(fund_centers)} fund columns found, expected {fund_count}"
+            )
 
-            try:
-                val = float(cleaned)
-            except ValueError:
-                continue
+        if nav_row is None:
+            raise ValueError("Arena PDF: NAV row not found")
 
-            cx = sum((c["x0"] + c["x1"]) / 2 for c in tok) / len(tok)
-            idx = min(range(len(centers)), key=lambda i: abs(cx - centers[i]))
-            values[idx] = val
+        if mtd_row is None:
+            raise ValueError("Arena PDF: MTD row not found")
 
-        return values
+        nav_values = assign_to_columns(tokenize_row(nav_row), fund_centers, is_nav=True)
+        mtd_values = assign_to_columns(
+            tokenize_row(mtd_row), fund_centers, is_nav=False,
+            bare_numbers=row_top(mtd_row) > row_top(nav_row),
+        )
 
-    nav_tokens = build_tokens(nav_row)
-    mtd_tokens = build_tokens(mtd_row)
+        # --------------------------------------------------
+        # 7. Validation, then remember the layout
+        # --------------------------------------------------
+        if any(v is None for v in nav_values):
+            raise ValueError("Arena PDF: NAV values incomplete after alignment")
 
-    nav_values = assign_to_columns(nav_tokens, fund_centers, is_nav=True)
-    mtd_values = assign_to_columns(mtd_tokens, fund_centers, is_nav=False)
+        if any(v is None for v in mtd_values):
+            raise ValueError("Arena PDF: MTD values incomplete after alignment")
 
-    # --------------------------------------------------
-    # 9. Final validation
-    # --------------------------------------------------
-    if any(v is None for v in nav_values):
-        raise ValueError("Arena PDF: NAV values incomplete after alignment")
+        fund_top = row_top(fund_row)
+        save_template(fingerprint, "newest_extract", {
+            "fund_top": fund_top,
+            "fund_centers": fund_centers,
+            "nav_offset": row_top(nav_row) - fund_top,
+            "mtd_offset": row_top(mtd_row) - fund_top,
+        })
 
-    if any(v is None for v in mtd_values):
-        raise ValueError("Arena PDF: MTD values incomplete after alignment")
+    mark("columns", nav=len(nav_values), mtd=len(mtd_values))
 
     # --------------------------------------------------
-    # 10. Build output
+    # 8. Build output
     # --------------------------------------------------
     wf["NAV"] = nav_values
     wf["MTD"] = mtd_values
     wf["Variance"] = abs(wf["MTD"])
+    wf.attrs["pages_parsed"] = pages_parsed
+    mark("output", funds=len(wf))
 
     return wf
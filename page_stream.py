@@ -0,0 +1,48 @@
+from char_cache import iter_pages
+from char_table import CharTable
+from row_grouping import DEFAULT_Y_TOLERANCE
+
+
+def stream_rows(file_path, is_complete, y_tolerance=DEFAULT_Y_TOLERANCE,
+                on_page=None, **cache_kwargs):
+    """
+    Reads pages one at a time, grouping each new page into rows, and stops
+    parsing as soon as is_complete(page_rows) says every needed row was
+    found. is_complete only sees the page just read, so callers keep what
+    they learned from earlier pages and every row is looked at once.
+    on_page(page_number, page_chars) sees each page before row detection.
+    Returns (chars, rows, pages_parsed); chars is a CharTable and rows maps
+    (page, top) to a CharRow view into it, page by page. iter_pages() hands
+    over pages as views of its own table, so no char dicts outlive the
+    page being parsed.
+    """
+    chars = CharTable()
+    rows = {}
+    pages_parsed = 0
+
+    pages = iter_pages(file_path, **cache_kwargs)
+    try:
+        for page_chars in pages:
+            if on_page is not None:
+                on_page(pages_parsed, page_chars)
+            page = pages_parsed
+            pages_parsed += 1
+            if not page_chars:
+                continue
+
+            # Rows never span pages: group only the new page, and key by
+            # page too, so a row at a top an earlier page already used is
+            # kept rather than dropped or merged into the earlier one
+            start = len(chars)
+            chars.extend(page_chars)
+            page_rows = {
+                (page, y): row for y, row in chars.rows(y_tolerance, start).items()
+            }
+            rows.update(page_rows)
+            if is_complete(page_rows):
+                break
+    finally:
+        # Closes the PDF straight away on early exit
+        pages.close()
+
+    return chars, rows, pages_parsed
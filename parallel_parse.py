@@ -0,0 +1,73 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from char_cache import pack_pages
+from char_table import CharTable
+from pdf_backend import backend_name, iter_page_chars, page_count
+
+# Below this many pages, starting processes costs more than it saves
+PARALLEL_MIN_PAGES = 8
+
+# Chunks per worker: a little slack so one dense page range
+# does not leave the other workers idle
+CHUNKS_PER_WORKER = 2
+
+
+def parse_workers(workers=None):
+    """Processes per document: the argument, else ARENA_PARSE_WORKERS, else 1."""
+    if workers is None:
+        workers = int(os.environ.get("ARENA_PARSE_WORKERS", "1") or 1)
+    return max(int(workers), 1)
+
+
+def page_chunks(pages, workers):
+    """
+    Contiguous page ranges in page order: the first page alone (an early
+    exit often needs nothing more, and it arrives without waiting on a
+    whole range), then CHUNKS_PER_WORKER ranges per worker.
+    """
+    first, rest = pages[:1], pages[1:]
+    size = max(1, math.ceil(len(rest) / (workers * CHUNKS_PER_WORKER)))
+    return [first] + [rest[i:i + size] for i in range(0, len(rest), size)]
+
+
+def _parse_chunk(task):
+    # Runs in a worker: opens the PDF itself and ships back packed arrays,
+    # which pickle far smaller and faster than lists of char dicts
+    file_path, pages, bbox, backend = task
+    return pack_pages(list(iter_page_chars(file_path, pages, bbox, backend)))
+
+
+def iter_parallel_pages(file_path, pages=None, bbox=None, backend=None, workers=None):
+    """
+    Same pages as pdf_backend.iter_page_chars, parsed by a process pool in
+    page ranges and yielded in page order as CharRow views. Closing the
+    generator early cancels the ranges no worker has started and returns
+    without waiting for the running ones.
+    """
+    backend = backend_name(backend)
+    workers = parse_workers(workers)
+    if workers == 1:
+        yield from iter_page_chars(file_path, pages, bbox, backend)
+        return
+
+    selected = list(range(page_count(file_path, backend))) if pages is None else list(pages)
+    if len(selected) < PARALLEL_MIN_PAGES:
+        yield from iter_page_chars(file_path, selected, bbox, backend)
+        return
+
+    chunks = page_chunks(selected, workers)
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+    try:
+        futures = [
+            pool.submit(_parse_chunk, (file_path, chunk, bbox, backend))
+            for chunk in chunks
+        ]
+        for future in futures:
+            yield from CharTable.from_packed(future.result()).pages()
+    finally:
+        # Not a with block: on early exit it would wait for every range
+        # already running. Queued ranges are cancelled, running ones are
+        # left to finish in the background.
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,188 @@
+import ctypes
+import os
+
+# --------------------------------------------------
+# Char layer backends. Each yields, page by page, lists of
+# char dicts with exactly the char_cache CHAR_FIELDS (text,
+# x0, x1, top, bottom, fontname, size) in pdfplumber's
+# coordinate system (origin top-left, points).
+#
+#   ARENA_PDF_BACKEND=pdfplumber   (default) full pdfminer layout
+#   ARENA_PDF_BACKEND=pdfium       pypdfium2 text page, no dicts
+#                                  beyond the ones we return
+# --------------------------------------------------
+DEFAULT_BACKEND = "pdfplumber"
+
+
+def overlaps(char, bbox):
+    """True when the char's box intersects bbox (x0, top, x1, bottom)."""
+    x0, top, x1, bottom = bbox
+    return (
+        char["x1"] > x0 and char["x0"] < x1
+        and char["bottom"] > top and char["top"] < bottom
+    )
+
+
+def _clip(bbox, page_bbox):
+    x0, top, x1, bottom = bbox
+    px0, ptop, px1, pbottom = page_bbox
+    clipped = (max(x0, px0), max(top, ptop), min(x1, px1), min(bottom, pbottom))
+    if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+        return None
+    return clipped
+
+
+def _plumber_pages(file_path, pages=None, bbox=None):
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        selected = pdf.pages if pages is None else [pdf.pages[i] for i in pages]
+        for page in selected:
+            # crop() only filters the page's already-built chars, so it
+            # saves the dict copies below, not pdfminer's layout pass.
+            # Clip to the page first: crop() raises past its edges.
+            view = page
+            if bbox is not None:
+                clipped = _clip(bbox, page.bbox)
+                if clipped is None:
+                    yield []
+                    continue
+                view = page.crop(clipped)
+            chars = [
+                {
+                    "text": c["text"], "x0": c["x0"], "x1": c["x1"],
+                    "top": c["top"], "bottom": c["bottom"],
+                    "fontname": c["fontname"], "size": c["size"],
+                }
+                for c in view.chars
+            ]
+            # pdf.pages keeps every page's layout objects until the PDF
+            # closes; drop them once the chars are copied out
+            page.close()
+            del view
+            yield chars
+
+
+def _pdfium_font(raw, textpage, index, buf):
+    n = raw.FPDFText_GetFontInfo(textpage, index, buf, len(buf), None)
+    if n > len(buf):
+        buf = ctypes.create_string_buffer(n)
+        raw.FPDFText_GetFontInfo(textpage, index, buf, n, None)
+    return buf.value.decode("utf-8", "replace")
+
+
+def _pdfium_page_chars(raw, page, textpage, bbox):
+    height = raw.FPDF_GetPageHeightF(page)
+    is_generated = getattr(raw, "FPDFText_IsGenerated", None)
+
+    rect = raw.FS_RECTF()
+    buf = ctypes.create_string_buffer(128)
+
+    chars = []
+    for i in range(raw.FPDFText_CountChars(textpage)):
+        code = raw.FPDFText_GetUnicode(textpage, i)
+        # Line breaks and spaces pdfium synthesises between words
+        # are not glyphs in the content stream
+        if code in (0, 10, 13, 0xFFFE, 0xFFFF):
+            continue
+        if is_generated is not None and is_generated(textpage, i) == 1:
+            continue
+
+        # Loose box: advance width x font ascent/descent (the tight box
+        # is glyph ink only). x0 / x1 / bottom land within ~0.2 pt of
+        # pdfplumber, but pdfplumber's box is one font size tall, so
+        # tops differ by up to ~2 pt: cached chars and saved table
+        # regions are kept per backend
+        raw.FPDFText_GetLooseCharBox(textpage, i, ctypes.byref(rect))
+        char = {
+            "text": chr(code),
+            "x0": rect.left,
+            "x1": rect.right,
+            "top": height - rect.top,
+            "bottom": height - rect.bottom,
+            "fontname": _pdfium_font(raw, textpage, i, buf),
+            "size": raw.FPDFText_GetFontSize(textpage, i),
+        }
+        if bbox is None or overlaps(char, bbox):
+            chars.append(char)
+    return chars
+
+
+def _pdfium_pages(file_path, pages=None, bbox=None):
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as raw
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        selected = range(len(pdf)) if pages is None else pages
+        for index in selected:
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield _pdfium_page_chars(raw, page.raw, textpage.raw, bbox)
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+BACKENDS = {
+    "pdfplumber": _plumber_pages,
+    "pdfium": _pdfium_pages,
+}
+
+
+def backend_name(backend=None):
+    """The backend to use: the argument, else ARENA_PDF_BACKEND, else pdfplumber."""
+    name = backend or os.environ.get("ARENA_PDF_BACKEND") or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}' (known: {', '.join(BACKENDS)})")
+    return name
+
+
+def _parse_errors(name):
+    # What each parser raises for a damaged or unsupported PDF
+    if name == "pdfium":
+        import pypdfium2 as pdfium
+
+        return (pdfium.PdfiumError,)
+
+    from pdfminer.psparser import PSException
+    from pdfplumber.utils.exceptions import PdfminerException
+
+    return (PSException, PdfminerException)
+
+
+def page_count(file_path, backend=None):
+    """Number of pages, without parsing any page content."""
+    name = backend_name(backend)
+    try:
+        if name == "pdfium":
+            import pypdfium2 as pdfium
+
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+    except _parse_errors(name) as exc:
+        raise ValueError(f"Arena PDF: {name} cannot read {file_path} ({exc})") from exc
+
+
+def iter_page_chars(file_path, pages=None, bbox=None, backend=None):
+    """
+    Yields each selected page's chars through the chosen backend. A PDF
+    the parser cannot read raises ValueError, like any other statement
+    the extractors cannot handle.
+    """
+    name = backend_name(backend)
+    try:
+        yield from BACKENDS[name](file_path, pages, bbox)
+    except _parse_errors(name) as exc:
+        raise ValueError(f"Arena PDF: {name} cannot read {file_path} ({exc})") from exc
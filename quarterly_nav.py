@@ -1,18 +1,13 @@
-month = prev_nav_date_format.month
-    current_quarter = ((month - 1) // 3) + 1
+from nav_dates import nav_date
 
-    # Step 5: next quarter end month
-    next_quarter = current_quarter + 1
-    if next_quarter > 4:
-        next_quarter = 1
-        year = prev_nav_date_format.year + 1
-    else:
-        year = prev_nav_date_format.year
 
-    quarter_end_month = next_quarter * 3
+def next_quarter_end(prev_nav_date):
+    """
+    Steps 4-6: the quarter-end NAV date after the previous NAV date
+    (its quarter, the next quarter, that quarter's last day).
+    """
+    # nav_date does the quarter arithmetic for a whole column at once
+    return nav_date([prev_nav_date], freq="Q").iloc[0].to_pydatetime()
 
-    # Step 6: compute quarter-end date
-    next_quarter_end_date = (
-        datetime(year, quarter_end_month, 1)
-        + relativedelta(months=1, days=-1)
-    )
+
+# next_quarter_end_date = next_quarter_end(prev_nav_date_format)
@@ -0,0 +1,113 @@
+import os
+
+import pandas as pd
+
+
+def _fsync_dir(path):
+    # Make the rename itself durable (no-op where directories can't be opened)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class CsvSink:
+    """
+    Appends each statement's rows to one CSV, flushed and fsynced per
+    write. The header goes in only when the file starts out empty, so a
+    resumed run keeps appending to the same table.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.statements = 0
+        self.rows_written = 0
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._file = open(path, "a", newline="")
+
+    def write(self, df):
+        header = self._file.tell() == 0
+        df.to_csv(self._file, header=header, index=False)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.statements += 1
+        self.rows_written += len(df)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink:
+    """
+    Writes each statement as its own Parquet part file in a folder.
+    Parts are written to a temp name, fsynced and renamed, so every file
+    in the folder is complete and pd.read_parquet(folder) reads whatever
+    finished, even after a crash.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.statements = 0
+        self.rows_written = 0
+        os.makedirs(path, exist_ok=True)
+
+        # Continue numbering after parts left by an earlier run
+        existing = [
+            int(name[5:10]) for name in os.listdir(path)
+            if name.startswith("part-") and name.endswith(".parquet")
+            and name[5:10].isdigit()
+        ]
+        self._next = max(existing) + 1 if existing else 0
+
+    def write(self, df):
+        part = os.path.join(self.path, f"part-{self._next:05d}.parquet")
+        # Dot-prefixed, so dataset readers skip a half-written part
+        tmp = os.path.join(self.path, f".part-{self._next:05d}.parquet.tmp")
+
+        df.to_parquet(tmp, index=False)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, part)
+        _fsync_dir(self.path)
+
+        self._next += 1
+        self.statements += 1
+        self.rows_written += len(df)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sink(path):
+    """CSV sink for *.csv paths, otherwise a folder of Parquet parts."""
+    if str(path).lower().endswith(".csv"):
+        return CsvSink(path)
+    return ParquetSink(path)
+
+
+def read_results(path):
+    """Everything written to a sink so far."""
+    if str(path).lower().endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_parquet(path)
@@ -0,0 +1,92 @@
+import re
+
+COMMA_NUMBER = re.compile(r'\d{1,3}(?:,\d{3})+')
+KERNED_RUN = re.compile(r'[\d,\s]{7,}')
+PERCENT = re.compile(r'-?\d+\.\d+%')
+DATE = re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}')
+
+
+def comma_numbers(text):
+    """Comma-grouped integers as they appear in the row text."""
+    return COMMA_NUMBER.findall(text)
+
+
+def kerning_safe_comma_numbers(text):
+    """Comma-grouped integers, re-joining runs split by kerning spaces."""
+    numbers = []
+    for run in KERNED_RUN.findall(text):
+        cleaned = run.replace(" ", "")
+        if COMMA_NUMBER.fullmatch(cleaned):
+            numbers.append(cleaned)
+    return numbers
+
+
+def classify_rows(rows, nav_numbers=comma_numbers, extra=None):
+    """
+    One walk over the rows, one feature record per row (in row order):
+    text, comma-number / percent counts, date presence, 'Arena' count.
+    extra(row) may add variant-specific fields to each record.
+    """
+    features = []
+
+    for y, row in rows.items():
+        text = "".join(c["text"] for c in row)
+        navs = nav_numbers(text)
+        mtds = PERCENT.findall(text)
+
+        record = {
+            "y": y,
+            "top": min(c["top"] for c in row),
+            "row": row,
+            "text": text,
+            "nav_nums": navs,
+            "mtd_nums": mtds,
+            "nav_count": len(navs),
+            "mtd_count": len(mtds),
+            "has_comma": "," in text,
+            "has_percent": "%" in text,
+            "has_date": DATE.search(text) is not None,
+            "arena_count": text.count("Arena"),
+        }
+        if extra is not None:
+            record.update(extra(row))
+        features.append(record)
+
+    return features
+
+
+def first_row(features, predicate):
+    return next((f for f in features if predicate(f)), None)
+
+
+def nav_mtd_values(features, count):
+    """
+    (NAV values, MTD values) from features in reading order (top-down,
+    page by page) carrying the tokenizer.row_values() fields; None for a
+    row that was not found. MTD is the first row with count percentages.
+    Returns printed as bare numbers only count on a row after the NAV
+    row, so fund numbers in the header rows above it are never taken for
+    returns.
+    """
+    nav_at = next(
+        (i for i, f in enumerate(features) if len(f["nav_values"]) >= count), None
+    )
+    mtd = first_row(features, lambda f: len(f["mtd_values"]) >= count)
+
+    nav_values = None if nav_at is None else features[nav_at]["nav_values"][:count]
+    mtd_values = None if mtd is None else mtd["mtd_values"][:count]
+
+    if mtd is None and nav_at is not None:
+        below = first_row(
+            features[nav_at + 1:], lambda f: len(f["return_values"]) >= count
+        )
+        mtd_values = None if below is None else below["return_values"][:count]
+
+    return nav_values, mtd_values
+
+
+def densest_row(features, key):
+    """Record with the highest features[key]; first one wins ties, like max()."""
+    if not features:
+        return None
+    return max(features, key=lambda f: f[key])
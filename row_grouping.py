@@ -0,0 +1,63 @@
+import numpy as np
+
+# Chars whose tops sit within this many points of their neighbour
+# belong to the same visual row (round(top, 1) split rows on jitter)
+DEFAULT_Y_TOLERANCE = 1.0
+
+
+def group_rows(top, x0, y_tolerance=DEFAULT_Y_TOLERANCE):
+    """
+    Groups char indices into rows with one argsort + sweep.
+    Returns (row_tops, row_slices): row_slices[i] is an index array (a view
+    into one permutation) holding row i's chars sorted by x0. Rows come in
+    order of their first char, like the dicts they replace.
+    """
+    top = np.asarray(top, dtype=np.float64)
+    x0 = np.asarray(x0, dtype=np.float64)
+    n = len(top)
+    if n == 0:
+        return np.empty(0), []
+
+    # --------------------------------------------------
+    # 1. Sweep down the page: a gap above tolerance starts a row
+    # --------------------------------------------------
+    by_top = np.argsort(top, kind="stable")
+    breaks = np.diff(top[by_top]) > y_tolerance
+    starts = np.flatnonzero(np.concatenate(([True], breaks)))
+
+    row_of_sorted = np.cumsum(np.concatenate(([False], breaks)))
+    row_id = np.empty(n, dtype=np.intp)
+    row_id[by_top] = row_of_sorted
+
+    # --------------------------------------------------
+    # 2. Renumber rows by first appearance in the char stream
+    # --------------------------------------------------
+    first_char = np.minimum.reduceat(by_top, starts)
+    rank = np.empty(len(starts), dtype=np.intp)
+    rank[np.argsort(first_char, kind="stable")] = np.arange(len(starts))
+    row_id = rank[row_id]
+
+    row_tops = np.empty(len(starts))
+    row_tops[rank] = top[by_top[starts]]
+
+    # --------------------------------------------------
+    # 3. One lexsort: by row, then x0 (stable on ties)
+    # --------------------------------------------------
+    order = np.lexsort((x0, row_id))
+    bounds = np.flatnonzero(np.diff(row_id[order])) + 1
+    return row_tops, np.split(order, bounds)
+
+
+def group_char_rows(chars, y_tolerance=DEFAULT_Y_TOLERANCE):
+    """Dict-based adapter: {row top: [char dicts sorted by x0]}."""
+    if not chars:
+        return {}
+
+    top = np.fromiter((c["top"] for c in chars), dtype=np.float64, count=len(chars))
+    x0 = np.fromiter((c["x0"] for c in chars), dtype=np.float64, count=len(chars))
+    row_tops, row_slices = group_rows(top, x0, y_tolerance)
+
+    return {
+        round(float(y), 1): [chars[i] for i in idx.tolist()]
+        for y, idx in zip(row_tops, row_slices)
+    }
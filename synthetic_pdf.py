@@ -0,0 +1,251 @@
+import json
+import os
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+
+# --------------------------------------------------
+# Offline generator for Arena-style statements: one wide
+# table with fund name headers, a beginning-AUM row and an
+# MTD return row, written as a hand-built PDF (Helvetica,
+# no embedded fonts) so no PDF library is needed.
+# --------------------------------------------------
+LEFT_MARGIN = 90
+COLUMN_WIDTH = 68
+PAGE_HEIGHT = 792
+MAX_PAGE_WIDTH = 14400  # PDF user-space limit
+
+HEADER_TOP = 150
+NAV_TOP = 230
+MTD_TOP = 430  # below the 400 midline the gemini scripts split on
+
+NAME_SIZE = 7
+VALUE_SIZE = 7
+
+NAME_WORDS = ("Special", "Credit", "Income", "Finance", "Opportunity", "Select")
+
+# Helvetica advance widths (1/1000 em) for centering; the rest
+# are close enough at these sizes
+_WIDTHS = {",": 278, ".": 278, "/": 278, " ": 278, "%": 889, "-": 333}
+
+
+def _text_width(text, size):
+    total = 0
+    for ch in text:
+        if ch.isdigit():
+            total += 556
+        elif ch in _WIDTHS:
+            total += _WIDTHS[ch]
+        elif ch.isupper():
+            total += 667
+        else:
+            total += 500
+    return total * size / 1000
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _show(x, top, size, text, kern_at=None, kern_gap=0.0, gray=None):
+    """One text object; kern_at splits the string with a TJ gap (in points)."""
+    y = PAGE_HEIGHT - top - size
+    color = f"{gray} g " if gray is not None else ""
+    if kern_at is None:
+        body = f"({_escape(text)}) Tj"
+    else:
+        adjust = -kern_gap * 1000 / size
+        body = f"[({_escape(text[:kern_at])}) {adjust:.0f} ({_escape(text[kern_at:])})] TJ"
+    reset = " 0 g" if gray is not None else ""
+    return f"{color}BT /F1 {size} Tf {x:.2f} {y:.2f} Td {body} ET{reset}"
+
+
+def _centered(cx, top, size, text, **kw):
+    return _show(cx - _text_width(text, size) / 2, top, size, text, **kw)
+
+
+def write_pdf(path, pages):
+    """
+    pages: list of (width, height, [content operator lines]).
+    Writes a minimal PDF 1.4 file with one shared Helvetica font.
+    """
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    page_tree = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+               b"/Encoding /WinAnsiEncoding >>")
+
+    kids = []
+    for width, height, lines in pages:
+        stream = "\n".join(lines).encode("latin-1")
+        content = add(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        kids.append(add(
+            f"<< /Type /Page /Parent {page_tree} 0 R "
+            f"/MediaBox [0 0 {width:.0f} {height:.0f}] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> "
+            f"/Contents {content} 0 R >>".encode()
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode()
+    objects[page_tree - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] "
+        f"/Count {len(kids)} >>".encode()
+    )
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += (
+        b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, catalog, xref)
+    )
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _us_date(d):
+    return f"{d.month}/{d.day}/{d.year}"
+
+
+def make_statement(folder, fund_count=10, page_count=1, kerning=0.0,
+                   kern_gap=3.0, watermark=0, multiline_headers=False,
+                   period_end=date(2025, 9, 30), seed=0, name=None):
+    """
+    Writes <name>.pdf, a matching workflow workbook and <name>.truth.json
+    (fund order, NAV and MTD per column) into folder.
+
+    kerning: share of NAV values drawn with a kerning gap inside the number
+    watermark: number of stray light-gray lowercase letters on the table page
+    """
+    rng = random.Random(seed)
+    name = name or f"arena_{fund_count}f_{page_count}p_{seed}"
+    os.makedirs(folder, exist_ok=True)
+
+    width = LEFT_MARGIN + fund_count * COLUMN_WIDTH + 30
+    if width > MAX_PAGE_WIDTH:
+        raise ValueError(
+            f"Synthetic PDF: {fund_count} funds need {width:.0f}pt, "
+            f"over the {MAX_PAGE_WIDTH}pt page limit"
+        )
+
+    aum_date = period_end + timedelta(days=1)
+    prev_date = period_end.replace(day=1) - timedelta(days=1)
+
+    # --------------------------------------------------
+    # 1. Ground truth
+    # --------------------------------------------------
+    funds = []
+    for i in range(fund_count):
+        word = rng.choice(NAME_WORDS)
+        nav = rng.randrange(1_000_000, 99_999_999)
+        mtd = round(rng.uniform(-3, 3), 2)
+        funds.append({
+            "header": [f"Arena {word}", f"Fund {i + 1}"] if multiline_headers
+                      else [f"Arena Fund {i + 1}"],
+            "Fund Name": f"Arena {word} Fund {i + 1}" if multiline_headers
+                         else f"Arena Fund {i + 1}",
+            "Fund UCN": f"ARN{i + 1:05d}",
+            "NAV": float(nav),
+            "MTD": mtd,
+            "Prev NAV": float(round(nav / (1 + mtd / 100))),
+            "kerned": rng.random() < kerning,
+        })
+
+    # --------------------------------------------------
+    # 2. Table page
+    # --------------------------------------------------
+    lines = [
+        _show(20, 40, 12, "Arena Investors, LP"),
+        _show(20, 58, 9, f"Monthly Performance Summary - {_us_date(period_end)}"),
+        _show(20, NAV_TOP, VALUE_SIZE, _us_date(aum_date)),
+        _show(20, MTD_TOP, VALUE_SIZE, _us_date(period_end)),
+    ]
+
+    for i, fund in enumerate(funds):
+        cx = LEFT_MARGIN + (i + 0.5) * COLUMN_WIDTH
+
+        for line_no, text in enumerate(fund["header"]):
+            lines.append(_centered(cx, HEADER_TOP + line_no * 10, NAME_SIZE, text))
+
+        nav_text = f"{fund['NAV']:,.0f}"
+        if fund["kerned"]:
+            # Gap inside the leading digit group, like "9  5,000,000"
+            split = nav_text.index(",")
+            lines.append(_centered(cx, NAV_TOP, VALUE_SIZE, nav_text,
+                                   kern_at=max(split - 1, 1), kern_gap=kern_gap))
+        else:
+            lines.append(_centered(cx, NAV_TOP, VALUE_SIZE, nav_text))
+
+        lines.append(_centered(cx, MTD_TOP, VALUE_SIZE, f"{fund['MTD']:.2f}%"))
+
+    for _ in range(watermark):
+        letter = rng.choice("aoce")
+        lines.append(_show(rng.uniform(LEFT_MARGIN, width - 30),
+                           rng.uniform(HEADER_TOP - 20, MTD_TOP + 40),
+                           VALUE_SIZE, letter, gray=0.85))
+
+    pages = [(width, PAGE_HEIGHT, lines)]
+
+    # --------------------------------------------------
+    # 3. Filler pages (disclosures), so page-streaming
+    #    extractors have something to skip
+    # --------------------------------------------------
+    for page in range(1, page_count):
+        filler = [_show(20, 40, 10, f"Important Disclosures ({page + 1})")]
+        for row in range(40):
+            filler.append(_show(
+                20, 70 + row * 16, 8,
+                f"Past performance is not indicative of future results. Note {row + 1}."
+            ))
+        pages.append((612, PAGE_HEIGHT, filler))
+
+    pdf_path = os.path.join(folder, f"{name}.pdf")
+    write_pdf(pdf_path, pages)
+
+    # --------------------------------------------------
+    # 4. Workflow workbook and ground truth
+    # --------------------------------------------------
+    workflow_path = os.path.join(folder, f"{name}.workflow.xlsx")
+    pd.DataFrame({
+        "Fund UCN": [f["Fund UCN"] for f in funds],
+        "Fund Name": [f["Fund Name"] for f in funds],
+        "DATE": pd.Timestamp(prev_date),
+        "NAV (thous)": [f["Prev NAV"] for f in funds],
+    }).to_excel(workflow_path, index=False)
+
+    truth_path = os.path.join(folder, f"{name}.truth.json")
+    with open(truth_path, "w") as f:
+        json.dump({
+            "pdf": os.path.basename(pdf_path),
+            "workflow": os.path.basename(workflow_path),
+            "fund_count": fund_count,
+            "page_count": page_count,
+            "kerning": kerning,
+            "watermark": watermark,
+            "multiline_headers": multiline_headers,
+            "funds": [
+                {k: fund[k] for k in ("Fund UCN", "Fund Name", "NAV", "MTD", "kerned")}
+                for fund in funds
+            ],
+        }, f, indent=1)
+
+    return pdf_path, workflow_path, truth_path
+
+
+# make_statement("synthetic/", fund_count=50, page_count=3, kerning=0.2, watermark=40)
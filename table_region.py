@@ -0,0 +1,123 @@
+import json
+import os
+import re
+
+from cache_paths import atomic_write, cache_dir
+from char_cache import chars_to_words, load_pages, load_words
+from pdf_backend import DEFAULT_BACKEND, backend_name, overlaps
+
+# Fixed table regions per issuer as (x0, top, x1, bottom) in PDF points.
+# Issuers without an entry get their region detected on the first run.
+ISSUER_REGIONS = {}
+
+# Band the gemini_logic* scripts already assume around the two date rows
+HEADER_HEIGHT = 135
+ROW_PADDING = 12
+MIDLINE = 400
+
+DATE_PATTERN = re.compile(r'\d{1,2}/\d{1,2}/202')
+REGIONS_FILE = "regions.json"
+
+
+def anchor_rows(words):
+    """The AUM and returns date words (above / below MIDLINE), or None each."""
+    dates = [w for w in words if DATE_PATTERN.search(w['text'])]
+    aum_row = next((w for w in dates if w['top'] < MIDLINE), None)
+    mtd_row = next((w for w in dates if w['top'] > MIDLINE), None)
+    return aum_row, mtd_row
+
+
+def detect_table_bbox(words):
+    """
+    Table band from the AUM / returns date anchors: fund headers above the
+    AUM row down to just below the returns row, across the text extent.
+    """
+    aum_row, mtd_row = anchor_rows(words)
+
+    if aum_row is None or mtd_row is None:
+        return None
+
+    # Stay inside the page: pdfplumber refuses crops past its edges
+    x0 = min(w['x0'] for w in words)
+    x1 = max(w['x1'] for w in words)
+    bottom = max(w['bottom'] for w in words)
+
+    return (
+        x0,
+        max(0.0, aum_row['top'] - HEADER_HEIGHT),
+        x1,
+        min(bottom, mtd_row['bottom'] + ROW_PADDING),
+    )
+
+
+def _regions_path():
+    return os.path.join(cache_dir("regions"), REGIONS_FILE)
+
+
+def _read_regions():
+    try:
+        with open(_regions_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _region_key(issuer, backend=None):
+    # Backends disagree on char tops by up to ~2 pt, so each one
+    # detects and keeps its own region (like the char cache entries)
+    backend = backend_name(backend)
+    return issuer if backend == DEFAULT_BACKEND else f"{issuer}_{backend}"
+
+
+def save_region(issuer, bbox, backend=None):
+    regions = _read_regions()
+    regions[_region_key(issuer, backend)] = list(bbox)
+    with atomic_write(_regions_path()) as f:
+        json.dump(regions, f, indent=1, sort_keys=True)
+
+
+def _cropping():
+    return os.environ.get("ARENA_TABLE_CROP") == "1"
+
+
+def table_bbox(pdf_path, issuer="arena", backend=None):
+    """
+    Crop region for the issuer's statements, or None when cropping is off
+    (set ARENA_TABLE_CROP=1 to enable) or no region is known yet. Order:
+    ISSUER_REGIONS, then the region an earlier run saved for this backend.
+    """
+    if not _cropping():
+        return None
+
+    if issuer in ISSUER_REGIONS:
+        return tuple(ISSUER_REGIONS[issuer])
+
+    saved = _read_regions().get(_region_key(issuer, backend))
+    return None if saved is None else tuple(saved)
+
+
+def table_words(pdf_path, issuer="arena", backend=None):
+    """
+    First-page words, cropped to the issuer's table region when cropping
+    is on. A known region is only trusted if both date anchor rows fall
+    inside it; otherwise (other page size, shifted layout, no region yet)
+    the full page is parsed once, the region re-detected and saved, and
+    the words cropped in memory.
+    """
+    bbox = table_bbox(pdf_path, issuer, backend)
+    if bbox is not None:
+        words = load_words(pdf_path, bbox=bbox, backend=backend)
+        if None not in anchor_rows(words):
+            return words
+
+    chars = load_pages(pdf_path, pages=(0,), backend=backend)[0]
+    words = chars_to_words(chars)
+    if not _cropping():
+        return words
+
+    bbox = detect_table_bbox(words)
+    if bbox is None:
+        return words
+    if issuer not in ISSUER_REGIONS:
+        save_region(issuer, bbox, backend)
+    return chars_to_words([c for c in chars if overlaps(c, bbox)])
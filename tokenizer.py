@@ -0,0 +1,118 @@
+import re
+
+# --------------------------------------------------
+# Precompiled token patterns (spaces already removed)
+# --------------------------------------------------
+DATE = re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}')
+NAV = re.compile(r'\d{1,3}(?:,\d{3})+|\d{6,}')
+MTD = re.compile(r'(-?\d+(?:\.\d+)?)%')
+NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+NUMERIC_CHARS = frozenset("0123456789,.%-/")
+
+# Glyphs closer than this belong to one token; numeric glyphs get a wider
+# allowance so kerning-split values ('9' + '5,000,000') weld back together
+TEXT_GAP = 2.0
+NUMERIC_GAP = 6.0
+
+
+def classify_token(text):
+    """Returns (kind, value) for one token's text."""
+    cleaned = text.replace(" ", "")
+
+    if DATE.fullmatch(cleaned):
+        return "date", cleaned
+
+    m = MTD.fullmatch(cleaned)
+    if m:
+        return "mtd", float(m.group(1))
+
+    if NAV.fullmatch(cleaned):
+        return "nav", float(cleaned.replace(",", ""))
+
+    if NUMBER.fullmatch(cleaned):
+        return "number", float(cleaned)
+
+    return "text", None
+
+
+def _token(chars):
+    text = "".join(c["text"] for c in chars)
+    kind, value = classify_token(text)
+    return {
+        "kind": kind,
+        "text": text,
+        "value": value,
+        "x0": chars[0]["x0"],
+        "x1": chars[-1]["x1"],
+        "cx": sum((c["x0"] + c["x1"]) / 2 for c in chars) / len(chars),
+        "chars": chars,
+    }
+
+
+def tokenize_row(row, text_gap=TEXT_GAP, numeric_gap=NUMERIC_GAP, split_on_space=True):
+    """
+    One pass over a row's x-sorted chars, emitting typed tokens:
+    'nav' (comma-grouped integer), 'mtd' (percentage), 'date', 'number'
+    or 'text', each with its parsed value and x-extent.
+    """
+    tokens = []
+    current = []
+
+    for c in row:
+        if split_on_space and c["text"].isspace():
+            if current:
+                tokens.append(_token(current))
+            current = []
+            continue
+
+        if current:
+            prev = current[-1]
+            gap = c["x0"] - prev["x1"]
+            numeric = c["text"] in NUMERIC_CHARS and prev["text"] in NUMERIC_CHARS
+            if gap > (numeric_gap if numeric else text_gap):
+                tokens.append(_token(current))
+                current = []
+
+        current.append(c)
+
+    if current:
+        tokens.append(_token(current))
+
+    return tokens
+
+
+def row_values(row, min_nav=0, **tokenize_kw):
+    """
+    Typed values of one row for row_features.classify_rows(extra=...):
+    nav_values ('nav' tokens >= min_nav), mtd_values ('mtd' tokens) and
+    return_values ('mtd' and bare 'number' tokens, in x order).
+    """
+    nav = []
+    mtd = []
+    returns = []
+
+    for tok in tokenize_row(row, **tokenize_kw):
+        if tok["kind"] == "nav" and tok["value"] >= min_nav:
+            nav.append(tok["value"])
+        if tok["kind"] == "mtd":
+            mtd.append(tok["value"])
+        if tok["kind"] in ("mtd", "number"):
+            returns.append(tok["value"])
+
+    return {"nav_values": nav, "mtd_values": mtd, "return_values": returns}
+
+
+def merge_fragments(words, max_gap):
+    """
+    Welds horizontally adjacent words (x-gap below max_gap) into one,
+    e.g. '9' + '5,000,000'. Returns new dicts; the input is left alone.
+    """
+    merged = []
+    for w in sorted(words, key=lambda x: x['x0']):
+        if merged and w['x0'] - merged[-1]['x1'] < max_gap:
+            merged[-1]['text'] += w['text']
+            merged[-1]['x1'] = w['x1']
+        else:
+            merged.append(dict(w))
+    return merged
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from cache_paths import atomic_write, cache_dir
+from char_cache import file_digest
+
+# Snapshots already read in this process, keyed by (path, columns)
+_memory = {}
+
+
+def _meta_path(folder, workflow_path):
+    key = hashlib.sha1(os.path.abspath(workflow_path).encode()).hexdigest()
+    return os.path.join(folder, f"{key}.json")
+
+
+def _read_meta(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _parquet_errors():
+    # ArrowException covers the mixed-type object columns Excel produces;
+    # ImportError is pandas without a Parquet engine
+    try:
+        from pyarrow import ArrowException
+    except ImportError:
+        return (ImportError,)
+    return (ArrowException, ImportError)
+
+
+def _write_snapshot(folder, workflow_path, digest):
+    df = pd.read_excel(workflow_path)
+
+    # Parquet first; mixed-type object columns from Excel can
+    # refuse to convert, in which case keep a pickle instead
+    snapshot = os.path.join(folder, f"{digest}.parquet")
+    try:
+        with atomic_write(snapshot, "wb") as f:
+            df.to_parquet(f, index=False)
+    except _parquet_errors():
+        snapshot = os.path.join(folder, f"{digest}.pkl")
+        with atomic_write(snapshot, "wb") as f:
+            df.to_pickle(f)
+    return snapshot
+
+
+def _read_snapshot(snapshot, columns):
+    if snapshot.endswith(".parquet"):
+        return pd.read_parquet(snapshot, columns=columns)
+    df = pd.read_pickle(snapshot)
+    return df if columns is None else df[columns]
+
+
+def snapshot_path(workflow_path, cache=None):
+    """
+    Returns the columnar snapshot for the workbook, rebuilding it only
+    when the file's mtime moved AND its SHA-256 changed.
+    """
+    folder = cache or cache_dir("workflow")
+    st = os.stat(workflow_path)
+    meta_path = _meta_path(folder, workflow_path)
+    meta = _read_meta(meta_path)
+
+    snapshot = meta.get("snapshot")
+    fresh = (
+        snapshot is not None
+        and os.path.exists(snapshot)
+        and meta.get("mtime_ns") == st.st_mtime_ns
+        and meta.get("size") == st.st_size
+    )
+    if fresh:
+        return snapshot
+
+    # mtime moved: only re-parse when the contents really changed
+    digest = file_digest(workflow_path)
+    if snapshot is None or meta.get("sha256") != digest or not os.path.exists(snapshot):
+        snapshot = _write_snapshot(folder, workflow_path, digest)
+
+    meta = {
+        "workflow": os.path.abspath(workflow_path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "snapshot": snapshot,
+    }
+    with atomic_write(meta_path) as f:
+        json.dump(meta, f, indent=1)
+
+    return snapshot
+
+
+def load_workflow(workflow_path, columns=None, cache=None):
+    """Workflow workbook as a DataFrame, read from its columnar snapshot."""
+    st = os.stat(workflow_path)
+    key = (os.path.abspath(workflow_path), None if columns is None else tuple(columns))
+
+    hit = _memory.get(key)
+    if hit is None or hit[0] != st.st_mtime_ns:
+        snapshot = snapshot_path(workflow_path, cache=cache)
+        df = _read_snapshot(snapshot, None if columns is None else list(columns))
+        _memory[key] = (st.st_mtime_ns, df)
+        hit = _memory[key]
+
+    # Callers add columns and rename in place
+    return hit[1].copy()
+
+
+def clear_memory():
+    _memory.clear()